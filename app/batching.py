@@ -0,0 +1,45 @@
+import asyncio
+from typing import Any, Callable, List, Optional
+
+
+class Batcher:
+    # Collects items until batch_size of them are waiting or max_wait has
+    # passed since the first one arrived, then hands them to flush_callback
+    # together.
+    def __init__(
+        self,
+        batch_size: int,
+        max_wait: float,
+        flush_callback: Callable[[List[Any]], None],
+    ):
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self.flush_callback = flush_callback
+        self._items: List[Any] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item: Any) -> None:
+        self._items.append(item)
+
+        if len(self._items) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self.flush
+            )
+
+    def flush(self) -> None:
+        items = self.clear()
+        if items:
+            self.flush_callback(items)
+
+    def clear(self) -> List[Any]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        items, self._items = self._items, []
+        return items
@@ -0,0 +1,79 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.metrics import counter, gauge
+
+cache_requests = counter(
+    "cache_requests", "Cache lookups by outcome", ("cache", "result")
+)
+cache_entries = gauge("cache_entries", "Entries held by a cache", ("cache",))
+
+
+class TTLCache:
+    def __init__(
+        self, ttl: float, maxsize: Optional[int] = None, name: Optional[str] = None
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.name = name
+        self._entries: OrderedDict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+        if name:
+            cache_entries.labels(name).set_function(lambda: len(self._entries))
+
+    async def get_or_load(
+        self, key: Hashable, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self._count("hit")
+            return entry[1]
+
+        self._count("miss")
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(loader())
+            self._pending[key] = pending
+            pending.add_done_callback(lambda future: self._store(key, future))
+
+        return await asyncio.shield(pending)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._pending.pop(key, None)
+        self._put(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        # Dropping the pending load too keeps a read that started before the
+        # change from writing its stale answer back.
+        self._entries.pop(key, None)
+        self._pending.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._pending.clear()
+
+    def _count(self, result: str) -> None:
+        if self.name:
+            cache_requests.labels(self.name, result).inc()
+
+    def _put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        if self.maxsize is not None:
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def _store(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._pending.get(key) is not future:
+            return
+        self._pending.pop(key)
+
+        if future.cancelled() or future.exception() is not None:
+            return
+        if future.result() is not None:
+            self._put(key, future.result())
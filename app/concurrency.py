@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from app.database.stats import PoolWaitStats
+from app.dispatch import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+
+class ConcurrencyController:
+    # AIMD over the dispatcher limit. Each interval, the mean handler latency
+    # of every task type and message priority is compared against an EWMA of
+    # its previous interval means. Durations that differ by type or priority,
+    # or vary from one task to the next, average out instead of reading as
+    # overload; a sustained rise shows up until the baseline catches up.
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        apply_limit: Callable[[int], Awaitable[None]],
+        min_limit: int,
+        max_limit: int,
+        latency_tolerance: float = 1.5,
+        error_rate_threshold: float = 0.1,
+        decrease_factor: float = 0.75,
+        wait_stats: Optional[PoolWaitStats] = None,
+        db_wait_threshold: float = 0.05,
+        baseline_smoothing: float = 0.1,
+    ):
+        self.dispatcher = dispatcher
+        self.apply_limit = apply_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self.error_rate_threshold = error_rate_threshold
+        self.decrease_factor = decrease_factor
+        self.wait_stats = wait_stats
+        self.db_wait_threshold = db_wait_threshold
+        self.baseline_smoothing = baseline_smoothing
+        self.last_decision: Optional[str] = None
+        self._baselines: Dict[Hashable, float] = {}
+        self._latencies: Dict[Hashable, List[float]] = {}
+        self._samples = 0
+        self._errors = 0
+        self._saturated = False
+        self._wait_mark = (0, 0.0)
+
+    def record(
+        self, task_type: str, latency: float, error: bool = False, priority: int = 0
+    ) -> None:
+        totals = self._latencies.setdefault((task_type, priority), [0, 0.0])
+        totals[0] += 1
+        totals[1] += latency
+
+        self._samples += 1
+        if error:
+            self._errors += 1
+
+    def latency_ratio(self) -> float:
+        # Weighted by sample count, so a rarely seen key cannot swing the
+        # decision on its own.
+        weighted = 0.0
+        for key, (count, total) in self._latencies.items():
+            mean = total / count
+            baseline = self._baselines.get(key, mean)
+            weighted += count * (mean / baseline if baseline > 0 else 1.0)
+            self._baselines[key] = (
+                baseline + (mean - baseline) * self.baseline_smoothing
+            )
+        return weighted / self._samples
+
+    def observe_load(self) -> None:
+        snapshot = self.dispatcher.snapshot()
+        waiting = sum(t["waiting"] for t in snapshot["task_types"].values())
+        if snapshot["running"] >= snapshot["limit"] and waiting:
+            self._saturated = True
+
+    def db_wait(self) -> float:
+        if self.wait_stats is None:
+            return 0.0
+
+        count, total = self._wait_mark
+        self._wait_mark = (self.wait_stats.count, self.wait_stats.total)
+        checkouts = self.wait_stats.count - count
+        return (self.wait_stats.total - total) / checkouts if checkouts else 0.0
+
+    def next_limit(self) -> int:
+        limit = self.dispatcher.limit
+        db_wait = self.db_wait()
+
+        if not self._samples:
+            self.last_decision = "hold"
+            return limit
+
+        latency_ratio = self.latency_ratio()
+        error_rate = self._errors / self._samples
+
+        if (
+            latency_ratio > self.latency_tolerance
+            or error_rate > self.error_rate_threshold
+            or db_wait > self.db_wait_threshold
+        ):
+            self.last_decision = (
+                f"decrease (latency x{latency_ratio:.2f}, errors {error_rate:.0%}, "
+                f"db wait {db_wait * 1000:.1f}ms)"
+            )
+            limit = int(limit * self.decrease_factor)
+        elif self._saturated:
+            self.last_decision = "increase"
+            limit += 1
+        else:
+            self.last_decision = "hold"
+
+        self._latencies = {}
+        self._samples = 0
+        self._errors = 0
+        self._saturated = False
+
+        return max(self.min_limit, min(self.max_limit, limit))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "adaptive": True,
+            "limit": self.dispatcher.limit,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "last_decision": self.last_decision,
+        }
+
+    async def run(self, interval: float) -> None:
+        ticks = 0
+        while True:
+            await asyncio.sleep(interval / 10)
+            self.observe_load()
+
+            ticks += 1
+            if ticks < 10:
+                continue
+            ticks = 0
+
+            limit = self.next_limit()
+            if limit != self.dispatcher.limit:
+                logger.info(
+                    f"Adjusting concurrency {self.dispatcher.limit} -> {limit}: "
+                    f"{self.last_decision}"
+                )
+                self.dispatcher.set_limit(limit)
+                await self.apply_limit(limit)
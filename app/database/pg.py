@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import (
+    DATABASE_URL,
+    DB_POOL_RECYCLE,
+    DB_STATEMENT_CACHE_SIZE,
+    WORKER_DB_POOL_MIN_SIZE,
+    WORKER_DB_POOL_MAX_SIZE,
+)
+from app.database.stats import PoolWaitStats, register_pool_metrics
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[asyncpg.Pool] = None
+_pool_lock = asyncio.Lock()
+pool_wait_stats = PoolWaitStats("asyncpg")
+
+
+def get_dsn() -> str:
+    url = make_url(DATABASE_URL).set(drivername="postgresql")
+    return url.render_as_string(hide_password=False)
+
+
+async def get_pool() -> asyncpg.Pool:
+    global _pool
+
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                get_dsn(),
+                min_size=WORKER_DB_POOL_MIN_SIZE,
+                max_size=WORKER_DB_POOL_MAX_SIZE,
+                statement_cache_size=DB_STATEMENT_CACHE_SIZE,
+                max_inactive_connection_lifetime=DB_POOL_RECYCLE,
+            )
+            register_pool_metrics("asyncpg", get_pool_stats)
+            logger.info("Created asyncpg pool")
+
+    return _pool
+
+
+@asynccontextmanager
+async def acquire() -> AsyncIterator[asyncpg.Connection]:
+    pool = await get_pool()
+
+    started = time.perf_counter()
+    async with pool.acquire() as connection:
+        pool_wait_stats.observe(time.perf_counter() - started)
+        yield connection
+
+
+async def get_session_connection(db: AsyncSession) -> asyncpg.Connection:
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    return raw.driver_connection
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    size = _pool.get_size() if _pool else 0
+    idle = _pool.get_idle_size() if _pool else 0
+    return {
+        "size": size,
+        "in_use": size - idle,
+        "idle": idle,
+        "max_size": WORKER_DB_POOL_MAX_SIZE,
+        **pool_wait_stats.snapshot(),
+    }
+
+
+async def close_pool() -> None:
+    global _pool
+
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+        logger.info("Closed asyncpg pool")
@@ -0,0 +1,43 @@
+from typing import Any, Callable, Dict
+
+from app.metrics import gauge, histogram
+
+pool_wait_seconds = histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+    ("pool",),
+)
+pool_connections = gauge(
+    "db_pool_connections", "Database connections by pool and state", ("pool", "state")
+)
+
+
+class PoolWaitStats:
+    def __init__(self, pool: str):
+        self.pool = pool
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._histogram = pool_wait_seconds.labels(pool)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.count,
+            "avg_wait_ms": (
+                round(self.total / self.count * 1000, 3) if self.count else 0
+            ),
+            "max_wait_ms": round(self.max * 1000, 3),
+        }
+
+
+def register_pool_metrics(pool: str, get_stats: Callable[[], Dict[str, Any]]) -> None:
+    for state in ("in_use", "idle", "overflow"):
+        pool_connections.labels(pool, state).set_function(
+            lambda state=state: get_stats().get(state, 0)
+        )
@@ -0,0 +1,167 @@
+import asyncio
+import heapq
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.tenants import DEFAULT_TENANT
+
+
+class _TenantQueue:
+    def __init__(self, weight: float, pass_value: float):
+        self.weight = weight
+        self.pass_value = pass_value
+        self.waiting: List[Tuple[int, int, asyncio.Future]] = []
+
+    def has_waiters(self) -> bool:
+        while self.waiting and self.waiting[0][2].done():
+            heapq.heappop(self.waiting)
+        return bool(self.waiting)
+
+
+class _TaskTypeState:
+    def __init__(self, concurrency: Optional[int], weight: float):
+        self.concurrency = concurrency
+        self.weight = weight
+        self.running = 0
+        self.pass_value = 0.0
+        self.virtual_time = 0.0
+        self.tenants: Dict[str, _TenantQueue] = {}
+
+    def has_waiters(self) -> bool:
+        for tenant, queue in list(self.tenants.items()):
+            if not queue.has_waiters():
+                del self.tenants[tenant]
+        return bool(self.tenants)
+
+    def has_capacity(self) -> bool:
+        return self.concurrency is None or self.running < self.concurrency
+
+    def push(
+        self, tenant: str, weight: float, entry: Tuple[int, int, asyncio.Future]
+    ) -> None:
+        # A tenant with nothing queued drops out of the rotation; on return it
+        # starts from the current virtual time rather than its old pass value,
+        # so idling does not bank credit to spend in a burst later.
+        queue = self.tenants.get(tenant)
+        if queue is None:
+            queue = self.tenants[tenant] = _TenantQueue(weight, self.virtual_time)
+        heapq.heappush(queue.waiting, entry)
+
+    def pop(self) -> asyncio.Future:
+        queue = min(self.tenants.values(), key=lambda candidate: candidate.pass_value)
+        _, _, future = heapq.heappop(queue.waiting)
+        self.virtual_time = queue.pass_value
+        queue.pass_value += 1.0 / queue.weight
+        return future
+
+    def waiting_count(self) -> int:
+        return sum(
+            1
+            for queue in self.tenants.values()
+            for *_, future in queue.waiting
+            if not future.done()
+        )
+
+
+class Dispatcher:
+    # Hands out worker slots to prefetched messages. Task types share the
+    # global limit by stride scheduling on their weights and never exceed their
+    # own concurrency cap. Within a type, tenants take turns by the same stride
+    # scheme on tenant weights, and higher message priority goes first only
+    # among a tenant's own messages, so one tenant's HIGH backlog cannot hold
+    # back everybody else.
+    def __init__(self, limit: int, tenant_weights: Optional[Dict[str, float]] = None):
+        self.limit = limit
+        self.tenant_weights = tenant_weights or {}
+        self.running = 0
+        self._types: Dict[str, _TaskTypeState] = {}
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+
+    def configure(
+        self, task_type: str, concurrency: Optional[int] = None, weight: float = 1
+    ) -> None:
+        self._types[task_type] = _TaskTypeState(concurrency, weight)
+
+    def set_limit(self, limit: int) -> None:
+        self.limit = limit
+        self._dispatch()
+
+    async def acquire(
+        self, task_type: str, priority: int = 0, tenant: Optional[str] = None
+    ) -> None:
+        state = self._types.get(task_type)
+        if state is None:
+            self.configure(task_type)
+            state = self._types[task_type]
+
+        if state.running == 0 and not state.has_waiters():
+            state.pass_value = max(state.pass_value, self._virtual_time)
+
+        tenant = tenant or DEFAULT_TENANT
+        future = asyncio.get_running_loop().create_future()
+        state.push(
+            tenant,
+            self.tenant_weights.get(tenant, 1),
+            (-priority, next(self._sequence), future),
+        )
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(task_type)
+            raise
+
+    def release(self, task_type: str) -> None:
+        state = self._types[task_type]
+        state.running -= 1
+        self.running -= 1
+        self._dispatch()
+
+    def running_count(self, task_type: str) -> int:
+        state = self._types.get(task_type)
+        return state.running if state else 0
+
+    def waiting_count(self, task_type: str) -> int:
+        state = self._types.get(task_type)
+        return state.waiting_count() if state else 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "running": self.running,
+            "task_types": {
+                task_type: {
+                    "running": state.running,
+                    "waiting": self.waiting_count(task_type),
+                    "concurrency": state.concurrency,
+                    "weight": state.weight,
+                    "tenants": {
+                        tenant: sum(1 for *_, f in queue.waiting if not f.done())
+                        for tenant, queue in state.tenants.items()
+                    },
+                }
+                for task_type, state in self._types.items()
+            },
+        }
+
+    def _dispatch(self) -> None:
+        while self.running < self.limit:
+            candidates = [
+                state
+                for state in self._types.values()
+                if state.has_capacity() and state.has_waiters()
+            ]
+            if not candidates:
+                return
+
+            state = min(candidates, key=lambda candidate: candidate.pass_value)
+            future = state.pop()
+
+            state.running += 1
+            self.running += 1
+            self._virtual_time = state.pass_value
+            state.pass_value += 1.0 / state.weight
+            future.set_result(None)
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from app.cache import TTLCache
+from app.config import (
+    TASK_CACHE_TTL,
+    TASK_CACHE_SIZE,
+    TASK_EVENTS_EXCHANGE_NAME,
+    TASK_EVENTS_BUFFER,
+    TASK_EVENTS_HEARTBEAT,
+)
+from app.metrics import counter, gauge
+from app.models.task import TaskStatus
+from app.worker import get_channel, publish_in_background, publish_task_event
+
+logger = logging.getLogger(__name__)
+
+task_events_received = counter(
+    "task_events_received", "Task events received from the broker"
+)
+task_event_overflows = counter(
+    "task_event_overflows", "Event subscribers dropped for falling behind"
+)
+
+# Statuses a task event can carry: every task status plus DELETED, which
+# delete_task publishes once the row is gone.
+DELETED_EVENT = "DELETED"
+EVENT_STATUSES = {status.value for status in TaskStatus} | {DELETED_EVENT}
+
+# TaskResponse objects for GET /tasks/{id}. Every change, including
+# dependents cancelled or released by a cascade, is published to the
+# task_events exchange, so each API process drops its copy as soon as the
+# worker or another API process changes the task; the TTL only covers events
+# lost while the broker was unavailable.
+task_cache = TTLCache(TASK_CACHE_TTL, maxsize=TASK_CACHE_SIZE, name="task")
+
+
+def parse_event_statuses(value: str) -> Set[str]:
+    statuses = {item.strip().upper() for item in value.split(",") if item.strip()}
+    unknown = statuses - EVENT_STATUSES
+    if unknown or not statuses:
+        raise ValueError(
+            f"Unknown event statuses: {', '.join(sorted(unknown)) or value}"
+        )
+    return statuses
+
+
+class Subscription:
+    def __init__(self, ids: Optional[Set[int]], statuses: Optional[Set[str]]):
+        self.ids = ids
+        self.statuses = statuses
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.overflowed = False
+
+    def deliver(self, event: Dict[str, Any], data: str) -> None:
+        if self.overflowed:
+            return
+        if self.statuses is not None and event["status"] not in self.statuses:
+            return
+
+        if self.queue.qsize() >= TASK_EVENTS_BUFFER:
+            # A reader this far behind is told to reconnect rather than
+            # growing its buffer without bound.
+            self.overflowed = True
+            task_event_overflows.inc()
+            self.queue.put_nowait(None)
+            return
+
+        self.queue.put_nowait((event, data))
+
+
+class EventHub:
+    # One broker subscription per API process; every waiting request is an
+    # in-memory Subscription, indexed by task id when it watches specific
+    # tasks, so an event only touches the connections interested in it.
+    def __init__(self):
+        self._by_task: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._all: Set[Subscription] = set()
+
+    def subscribe(
+        self, ids: Optional[Set[int]] = None, statuses: Optional[Set[str]] = None
+    ) -> Subscription:
+        subscription = Subscription(ids, statuses)
+        if ids is None:
+            self._all.add(subscription)
+        else:
+            for task_id in ids:
+                self._by_task[task_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription.ids is None:
+            self._all.discard(subscription)
+            return
+
+        for task_id in subscription.ids:
+            subscribers = self._by_task.get(task_id)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._by_task[task_id]
+
+    def publish(self, event: Dict[str, Any], data: str) -> None:
+        for subscription in list(self._by_task.get(event["task_id"], ())):
+            subscription.deliver(event, data)
+        for subscription in list(self._all):
+            subscription.deliver(event, data)
+
+    def count(self) -> int:
+        return len(self._all) + len(
+            {subscription for group in self._by_task.values() for subscription in group}
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "subscribers": self.count(),
+            "watched_tasks": len(self._by_task),
+        }
+
+
+event_hub = EventHub()
+
+gauge("task_event_subscribers", "Open long-poll and SSE subscriptions").set_function(
+    event_hub.count
+)
+
+
+def notify_task_changed(task_id: int, status: str) -> None:
+    task_cache.invalidate(task_id)
+    publish_in_background(
+        publish_task_event(task_id, status), f"event for task {task_id}"
+    )
+
+
+async def process_task_event(message: AbstractIncomingMessage) -> None:
+    try:
+        data = message.body.decode()
+        event = json.loads(data)
+        task_id = event["task_id"]
+    except Exception as e:
+        logger.error(f"Invalid task event: {e}")
+        return
+
+    task_events_received.inc()
+    task_cache.invalidate(task_id)
+    event_hub.publish(event, data)
+
+
+async def subscribe_task_events() -> None:
+    channel = await get_channel()
+
+    queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(TASK_EVENTS_EXCHANGE_NAME, routing_key="task.#")
+    await queue.consume(process_task_event, no_ack=True)
+
+    logger.info(f"Subscribed to task events on {TASK_EVENTS_EXCHANGE_NAME}")
+
+
+async def wait_for_event(
+    subscription: Subscription, timeout: float
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    try:
+        return await asyncio.wait_for(subscription.queue.get(), timeout=timeout)
+    except asyncio.TimeoutError:
+        return None
+
+
+async def stream_task_events(
+    ids: Optional[Set[int]] = None, statuses: Optional[Set[str]] = None
+) -> AsyncIterator[str]:
+    subscription = event_hub.subscribe(ids, statuses)
+    try:
+        yield ": connected\n\n"
+
+        while True:
+            item = await wait_for_event(subscription, TASK_EVENTS_HEARTBEAT)
+            if subscription.overflowed and item is None:
+                yield "event: overflow\ndata: {}\n\n"
+                return
+            if item is None:
+                yield ": ping\n\n"
+                continue
+
+            _, data = item
+            yield f"event: task\ndata: {data}\n\n"
+    finally:
+        event_hub.unsubscribe(subscription)
@@ -1,4 +1,28 @@
 from app.database.database import Base
-from app.models.task import Task, TaskStatus, TaskPriority
+from app.models.task import (
+    Task,
+    TaskStatus,
+    TaskPriority,
+    TASK_TRANSITIONS,
+    FINAL_TASK_STATUSES,
+)
+from app.models.outbox import OutboxMessage
+from app.models.schedule import ScheduledMessage
+from app.models.result import TaskResult
+from app.models.dependency import TaskDependency, WaitingMessage
+from app.models.counters import TaskCounter
 
-__all__ = ["Base", "Task", "TaskStatus", "TaskPriority"]
+__all__ = [
+    "Base",
+    "Task",
+    "TaskStatus",
+    "TaskPriority",
+    "TASK_TRANSITIONS",
+    "FINAL_TASK_STATUSES",
+    "OutboxMessage",
+    "ScheduledMessage",
+    "TaskResult",
+    "TaskDependency",
+    "WaitingMessage",
+    "TaskCounter",
+]
@@ -0,0 +1,42 @@
+from sqlalchemy import Column, Integer, BigInteger, Float, Enum
+from app.database.database import Base
+from app.models.task import TaskStatus, TaskPriority
+
+
+class TaskCounter(Base):
+    __tablename__ = "task_counters"
+
+    status = Column(Enum(TaskStatus), primary_key=True)
+    priority = Column(Enum(TaskPriority), primary_key=True)
+    shard = Column(Integer, primary_key=True)
+    task_count = Column(BigInteger, nullable=False, default=0)
+    timed_count = Column(BigInteger, nullable=False, default=0)
+    time_sum = Column(Float, nullable=False, default=0)
+    time_min = Column(Float, nullable=True)
+    time_max = Column(Float, nullable=True)
+
+
+# The trigger and functions that keep this table up to date live in the
+# 0001 migration; this query rebuilds it from scratch.
+REBUILD_TASK_COUNTERS_SQL = """
+    INSERT INTO task_counters
+        (status, priority, shard, task_count, timed_count, time_sum, time_min, time_max)
+    SELECT
+        status,
+        priority,
+        0,
+        count(*),
+        count(duration),
+        coalesce(sum(duration), 0),
+        min(duration),
+        max(duration)
+    FROM (
+        SELECT
+            status,
+            priority,
+            EXTRACT(EPOCH FROM completed_at - started_at)::float8 AS duration
+        FROM tasks
+    ) AS t
+    WHERE status IS NOT NULL AND priority IS NOT NULL
+    GROUP BY status, priority
+"""
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class TaskDependency(Base):
+    __tablename__ = "task_dependencies"
+    __table_args__ = (Index("ix_task_dependencies_task_id", "task_id"),)
+
+    depends_on_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    task_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+
+
+class WaitingMessage(Base):
+    __tablename__ = "task_waiting"
+
+    task_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    task_type = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    priority = Column(Integer, nullable=False, default=0)
+    tenant = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
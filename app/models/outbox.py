@@ -0,0 +1,14 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class OutboxMessage(Base):
+    __tablename__ = "task_outbox"
+
+    id = Column(BigInteger, primary_key=True)
+    task_type = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    priority = Column(Integer, nullable=False, default=0)
+    tenant = Column(String(64), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
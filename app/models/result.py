@@ -0,0 +1,15 @@
+from sqlalchemy import Column, ForeignKey, Integer, String, DateTime, LargeBinary
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class TaskResult(Base):
+    __tablename__ = "task_results"
+
+    task_id = Column(
+        Integer, ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    encoding = Column(String(16), nullable=False)
+    size = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.database.database import Base
+
+
+class ScheduledMessage(Base):
+    __tablename__ = "task_schedule"
+    __table_args__ = (Index("ix_task_schedule_scheduled_at", "scheduled_at"),)
+
+    id = Column(BigInteger, primary_key=True)
+    task_type = Column(String(64), nullable=False)
+    payload = Column(JSON, nullable=False)
+    priority = Column(Integer, nullable=False, default=0)
+    tenant = Column(String(64), nullable=True)
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
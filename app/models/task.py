@@ -1,4 +1,14 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    Float,
+    String,
+    Text,
+    DateTime,
+    Enum,
+    Index,
+    text,
+)
 from sqlalchemy.sql import func
 import enum
 from app.database.database import Base
@@ -13,6 +23,21 @@ class TaskStatus(str, enum.Enum):
     CANCELLED = "CANCELLED"
 
 
+FINAL_TASK_STATUSES = {TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED}
+
+TASK_TRANSITIONS = {
+    TaskStatus.PENDING: {TaskStatus.NEW, TaskStatus.PENDING, TaskStatus.IN_PROGRESS},
+    TaskStatus.IN_PROGRESS: {TaskStatus.PENDING, TaskStatus.IN_PROGRESS},
+    TaskStatus.COMPLETED: {TaskStatus.IN_PROGRESS},
+    TaskStatus.FAILED: {TaskStatus.NEW, TaskStatus.PENDING, TaskStatus.IN_PROGRESS},
+    TaskStatus.CANCELLED: {
+        TaskStatus.NEW,
+        TaskStatus.PENDING,
+        TaskStatus.IN_PROGRESS,
+    },
+}
+
+
 class TaskPriority(str, enum.Enum):
     LOW = "LOW"
     MEDIUM = "MEDIUM"
@@ -21,14 +46,44 @@ class TaskPriority(str, enum.Enum):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        Index("ix_tasks_created_at_id", "created_at", "id"),
+        Index("ix_tasks_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tasks_priority_created_at_id", "priority", "created_at", "id"),
+        Index("ix_tasks_tenant_created_at_id", "tenant", "created_at", "id"),
+        Index(
+            "ix_tasks_status_priority_created_at_id",
+            "status",
+            "priority",
+            "created_at",
+            "id",
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     priority = Column(Enum(TaskPriority), default=TaskPriority.MEDIUM)
     status = Column(Enum(TaskStatus), default=TaskStatus.NEW)
+    tenant = Column(
+        String(64), nullable=False, default="default", server_default="default"
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default=text("0"))
+    pending_parents = Column(
+        Integer, nullable=False, default=0, server_default=text("0")
+    )
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    scheduled_at = Column(DateTime(timezone=True), nullable=True)
     started_at = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    progress = Column(Float, nullable=True)
+    progress_message = Column(String(255), nullable=True)
     result = Column(Text, nullable=True)
+    result_size = Column(Integer, nullable=True)
     error_info = Column(Text, nullable=True)
+
+    @property
+    def result_ref(self):
+        if self.result_size is None:
+            return None
+        return f"/tasks/{self.id}/result"
@@ -1,16 +1,27 @@
 import asyncio
 import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from sqlalchemy.future import select
-from sqlalchemy import func, text
 from fastapi import FastAPI, APIRouter, Depends, Query
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database.database import get_db
+from app.cache import TTLCache
+from app.config import STATS_CACHE_TTL, TASK_QUEUE_NAME
+from app.database.database import get_db, get_pool_stats, AsyncSessionLocal
+from app.events import event_hub
+from app.metrics import CONTENT_TYPE, render_metrics
 from app.models.task import Task, TaskStatus, TaskPriority
-from app.worker import get_connection, get_channel
+from app.pagination import paginate_tasks, get_next_cursor
+from app.services.counters import get_task_counters
+from app.tenants import tenant_limiter
+from app.worker import (
+    get_connection,
+    get_channel,
+    get_publisher_stats,
+    get_task_queue_names,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -20,21 +31,28 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
+_stats_cache = TTLCache(STATS_CACHE_TTL, name="stats")
+
 
 async def get_rabbitmq_stats():
     try:
         connection = await get_connection()
         channel = await get_channel()
 
-        queue = await channel.get_queue("task_queue")
-
-        message_count = queue.declaration_result.message_count
-        consumer_count = queue.declaration_result.consumer_count
+        queues = {}
+        consumer_count = 0
+        for queue_name in get_task_queue_names():
+            queue = await channel.get_queue(queue_name)
+            queues[queue_name] = queue.declaration_result.message_count
+            consumer_count = max(
+                consumer_count, queue.declaration_result.consumer_count
+            )
 
         return {
-            "queue_name": "task_queue",
-            "message_count": message_count,
+            "queue_name": TASK_QUEUE_NAME,
+            "message_count": sum(queues.values()),
             "consumer_count": consumer_count,
+            "queues": queues,
             "connection_status": (
                 "connected" if not connection.is_closed else "disconnected"
             ),
@@ -42,7 +60,7 @@ async def get_rabbitmq_stats():
     except Exception as e:
         logger.error(f"Error getting RabbitMQ stats: {str(e)}")
         return {
-            "queue_name": "task_queue",
+            "queue_name": TASK_QUEUE_NAME,
             "message_count": "error",
             "consumer_count": "error",
             "connection_status": "error",
@@ -50,66 +68,82 @@ async def get_rabbitmq_stats():
         }
 
 
-async def get_task_stats(db: AsyncSession, page: int = 1, page_size: int = 10):
-    try:
-        status_counts = {}
-        for status in TaskStatus:
-            query = select(func.count()).select_from(Task).filter(Task.status == status)
-            result = await db.execute(query)
-            count = result.scalar()
-            status_counts[status.value] = count
-
-        priority_counts = {}
-        for priority in TaskPriority:
-            query = (
-                select(func.count()).select_from(Task).filter(Task.priority == priority)
-            )
-            result = await db.execute(query)
-            count = result.scalar()
-            priority_counts[priority.value] = count
+async def load_task_aggregates() -> Dict[str, Any]:
+    async with AsyncSessionLocal() as db:
+        rows = await get_task_counters(db)
 
-        query = select(func.count()).select_from(Task)
-        result = await db.execute(query)
-        total_count = result.scalar()
+    status_counts = {status.value: 0 for status in TaskStatus}
+    priority_counts = {priority.value: 0 for priority in TaskPriority}
+    total_count = 0
+    timed_count = 0
+    total_time = 0.0
+    min_time = None
+    max_time = None
+
+    for status, priority, count, timed, time_sum, time_min, time_max in rows:
+        count = int(count)
+        total_count += count
+        if status is not None:
+            status_counts[status.value] += count
+        if priority is not None:
+            priority_counts[priority.value] += count
+
+        if timed:
+            timed_count += int(timed)
+            total_time += float(time_sum)
+
+        if time_min is not None:
+            time_min = float(time_min)
+            min_time = time_min if min_time is None else min(min_time, time_min)
+
+        if time_max is not None:
+            time_max = float(time_max)
+            max_time = time_max if max_time is None else max(max_time, time_max)
+
+    return {
+        "total_tasks": total_count,
+        "status_counts": status_counts,
+        "priority_counts": priority_counts,
+        "processing_time": {
+            "avg_seconds": round(total_time / timed_count, 2) if timed_count else 0,
+            "min_seconds": round(min_time or 0, 2),
+            "max_seconds": round(max_time or 0, 2),
+        },
+    }
+
+
+async def get_task_stats(
+    db: AsyncSession, page: int = 1, page_size: int = 10, cursor: Optional[str] = None
+):
+    try:
+        aggregates = await _stats_cache.get_or_load("tasks", load_task_aggregates)
+        total_count = aggregates["total_tasks"]
 
         offset = (page - 1) * page_size
         total_pages = (
             (total_count + page_size - 1) // page_size if total_count > 0 else 1
         )
 
-        query = (
-            select(Task)
-            .order_by(Task.created_at.desc())
-            .offset(offset)
-            .limit(page_size)
-        )
-        result = await db.execute(query)
-        tasks = result.scalars().all()
+        query = paginate_tasks(select(Task), cursor, page_size)
+        if not cursor:
+            query = query.offset(offset)
 
-        query = text(
-            """
-            SELECT 
-                AVG(EXTRACT(EPOCH FROM (completed_at - started_at))) as avg_time,
-                MIN(EXTRACT(EPOCH FROM (completed_at - started_at))) as min_time,
-                MAX(EXTRACT(EPOCH FROM (completed_at - started_at))) as max_time
-            FROM tasks 
-            WHERE completed_at IS NOT NULL AND started_at IS NOT NULL
-        """
-        )
         result = await db.execute(query)
-        time_stats = result.first()
+        tasks = result.scalars().all()
 
         return {
             "total_tasks": total_count,
             "total_pages": total_pages,
             "current_page": page,
             "page_size": page_size,
-            "status_counts": status_counts,
-            "priority_counts": priority_counts,
+            "next_cursor": get_next_cursor(tasks, page_size),
+            "status_counts": aggregates["status_counts"],
+            "priority_counts": aggregates["priority_counts"],
             "tasks": [
                 {
                     "id": task.id,
                     "title": task.title,
+                    "tenant": task.tenant,
                     "status": task.status,
                     "priority": task.priority,
                     "created_at": (
@@ -122,15 +156,13 @@ async def get_task_stats(db: AsyncSession, page: int = 1, page_size: int = 10):
                         task.completed_at.isoformat() if task.completed_at else None
                     ),
                     "result": task.result,
+                    "result_size": task.result_size,
+                    "result_ref": task.result_ref,
                     "error_info": task.error_info,
                 }
                 for task in tasks
             ],
-            "processing_time": {
-                "avg_seconds": round(time_stats[0] or 0, 2) if time_stats else 0,
-                "min_seconds": round(time_stats[1] or 0, 2) if time_stats else 0,
-                "max_seconds": round(time_stats[2] or 0, 2) if time_stats else 0,
-            },
+            "processing_time": aggregates["processing_time"],
         }
     except Exception as e:
         logger.error(f"Error getting task stats: {str(e)}")
@@ -142,13 +174,20 @@ async def get_monitor_stats(
     db: AsyncSession = Depends(get_db),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from next_cursor"),
 ):
-    rabbitmq_stats = await get_rabbitmq_stats()
-    task_stats = await get_task_stats(db, page, page_size)
+    rabbitmq_stats, task_stats = await asyncio.gather(
+        _stats_cache.get_or_load("rabbitmq", get_rabbitmq_stats),
+        get_task_stats(db, page, page_size, cursor),
+    )
 
     return {
         "rabbitmq": rabbitmq_stats,
         "tasks": task_stats,
+        "database_pool": get_pool_stats(),
+        "publisher": get_publisher_stats(),
+        "events": event_hub.snapshot(),
+        "rate_limits": tenant_limiter.snapshot(),
         "timestamp": asyncio.get_event_loop().time(),
     }
 
@@ -181,5 +220,10 @@ async def get_monitor_dashboard():
         return f"<h1>Error loading dashboard</h1><p>{str(e)}</p>"
 
 
+async def get_metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
+
+
 def setup_monitoring(app: FastAPI):
     app.include_router(router)
+    app.add_api_route("/metrics", get_metrics, include_in_schema=False)
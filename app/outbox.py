@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Optional
+
+import asyncpg
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import OUTBOX_BATCH_SIZE, OUTBOX_POLL_INTERVAL, OUTBOX_NOTIFY_CHANNEL
+from app.database.database import AsyncSessionLocal
+from app.database.pg import get_dsn
+from app.models.outbox import OutboxMessage
+from app.worker import publish_tasks
+
+logger = logging.getLogger(__name__)
+
+_wakeup: Optional[asyncio.Event] = None
+
+
+def wake_outbox_relay() -> None:
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def relay_outbox_batch(db: AsyncSession) -> int:
+    result = await db.execute(
+        select(OutboxMessage)
+        .order_by(OutboxMessage.id)
+        .limit(OUTBOX_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    messages = result.scalars().all()
+
+    if not messages:
+        await db.rollback()
+        return 0
+
+    await publish_tasks(
+        [
+            (message.task_type, message.payload, message.priority, message.tenant)
+            for message in messages
+        ]
+    )
+
+    await db.execute(
+        delete(OutboxMessage).where(
+            OutboxMessage.id.in_([message.id for message in messages])
+        )
+    )
+    await db.commit()
+    return len(messages)
+
+
+async def listen_outbox_notifications() -> Optional[asyncpg.Connection]:
+    try:
+        connection = await asyncpg.connect(get_dsn())
+        await connection.add_listener(
+            OUTBOX_NOTIFY_CHANNEL, lambda *args: wake_outbox_relay()
+        )
+        return connection
+    except Exception as e:
+        logger.warning(
+            f"Could not listen on {OUTBOX_NOTIFY_CHANNEL}, relying on polling: {str(e)}"
+        )
+        return None
+
+
+async def run_outbox_relay() -> None:
+    global _wakeup
+
+    _wakeup = asyncio.Event()
+    logger.info(f"Starting outbox relay with batch size: {OUTBOX_BATCH_SIZE}")
+
+    # Messages written by other processes (dependent tasks released by the
+    # worker) announce themselves with NOTIFY; polling stays as the fallback.
+    listener = await listen_outbox_notifications()
+    try:
+        await relay_outbox_loop()
+    finally:
+        if listener is not None:
+            await listener.close()
+
+
+async def relay_outbox_loop() -> None:
+    while True:
+        _wakeup.clear()
+
+        try:
+            async with AsyncSessionLocal() as db:
+                relayed = await relay_outbox_batch(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error relaying outbox messages: {str(e)}")
+            relayed = 0
+
+        if relayed == OUTBOX_BATCH_SIZE:
+            continue
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+
+from app.models.task import Task
+
+
+def encode_cursor(task: Task) -> str:
+    data = json.dumps([task.created_at.isoformat(), task.id]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, task_id = json.loads(data)
+        return datetime.fromisoformat(created_at), int(task_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def paginate_tasks(query: Select, cursor: Optional[str], limit: int) -> Select:
+    query = query.order_by(Task.created_at.desc(), Task.id.desc())
+
+    if cursor:
+        created_at, task_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Task.created_at, Task.id) < tuple_(created_at, task_id)
+        )
+
+    return query.limit(limit)
+
+
+def get_next_cursor(tasks: List[Task], limit: int) -> Optional[str]:
+    if not tasks or len(tasks) < limit:
+        return None
+    return encode_cursor(tasks[-1])
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from app.config import PROGRESS_FLUSH_INTERVAL_MS
+from app.metrics import counter
+from app.repositories.task import update_progress
+
+logger = logging.getLogger(__name__)
+
+progress_reports = counter("task_progress_reports", "Progress reports from handlers")
+progress_writes = counter(
+    "task_progress_writes", "Progress values written to the database"
+)
+
+# Latest report per task since the last flush. Handlers only overwrite their
+# entry, so any number of reports between flushes costs one row in the next
+# batched UPDATE. Handlers on the thread executor report from other threads,
+# so writes and the swap in flush_progress hold the lock.
+_pending: Dict[int, Tuple[float, Optional[str]]] = {}
+_pending_lock = threading.Lock()
+
+
+class ProgressReporter:
+    def __init__(self, task_id: int):
+        self.task_id = task_id
+        self.fraction = 0.0
+
+    def report(self, fraction: float, message: Optional[str] = None) -> None:
+        self.fraction = min(max(float(fraction), 0.0), 1.0)
+        with _pending_lock:
+            _pending[self.task_id] = (self.fraction, message and message[:255])
+        progress_reports.inc()
+
+
+async def flush_progress() -> int:
+    global _pending
+
+    with _pending_lock:
+        updates, _pending = _pending, {}
+    if not updates:
+        return 0
+
+    rows = await update_progress(
+        [
+            (task_id, fraction, message)
+            for task_id, (fraction, message) in updates.items()
+        ]
+    )
+    progress_writes.inc(len(rows))
+
+    from app.worker import publish_task_event
+
+    await asyncio.gather(
+        *(
+            publish_task_event(
+                row["id"],
+                row["status"],
+                progress=row["progress"],
+                progress_message=row["progress_message"],
+            )
+            for row in rows
+        )
+    )
+    return len(rows)
+
+
+async def run_progress_flusher() -> None:
+    interval = PROGRESS_FLUSH_INTERVAL_MS / 1000
+    logger.info(f"Flushing task progress every {PROGRESS_FLUSH_INTERVAL_MS}ms")
+
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await flush_progress()
+            except Exception as e:
+                logger.error(f"Error flushing task progress: {str(e)}")
+    finally:
+        try:
+            await flush_progress()
+        except Exception as e:
+            logger.error(f"Error flushing task progress on shutdown: {str(e)}")
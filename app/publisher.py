@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import aio_pika
+
+from app.metrics import histogram
+
+logger = logging.getLogger(__name__)
+
+publish_latency = histogram(
+    "task_publish_latency_seconds",
+    "Time from publish() until the broker confirmed the message",
+)
+publish_batch_size = histogram(
+    "task_publish_batch_size",
+    "Messages published per confirm batch",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+
+
+class Publisher:
+    # Messages published within batch_delay of each other are sent together
+    # on one of a few confirm-mode channels, so they share a confirm wait
+    # instead of each holding the channel for a round trip. At most
+    # max_pending messages may wait for confirms; beyond that publish()
+    # blocks, which is how broker flow control reaches the callers.
+    def __init__(
+        self,
+        connection: aio_pika.abc.AbstractConnection,
+        channels: int,
+        batch_size: int,
+        batch_delay: float,
+        max_pending: int,
+    ):
+        self.connection = connection
+        self.channel_count = channels
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.batches = 0
+        self.messages = 0
+        self.failures = 0
+        self.flow_control_seconds = 0.0
+        self.pending = 0
+        self._slots = asyncio.Semaphore(max_pending)
+        self._channels: asyncio.Queue = asyncio.Queue()
+        self._buffer: List[Tuple[aio_pika.Message, str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: set = set()
+
+    async def start(self) -> None:
+        for _ in range(self.channel_count):
+            channel = await self.connection.channel(publisher_confirms=True)
+            self._channels.put_nowait(channel)
+
+        logger.info(f"Publisher started with {self.channel_count} confirm channels")
+
+    async def publish(self, message: aio_pika.Message, routing_key: str) -> None:
+        await self._slots.acquire()
+        self.pending += 1
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self._buffer.append((message, routing_key, future, time.perf_counter()))
+
+            if len(self._buffer) >= self.batch_size:
+                self._flush()
+            elif self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(
+                    self.batch_delay, self._flush
+                )
+
+            await future
+        finally:
+            self.pending -= 1
+            self._slots.release()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        if not self._buffer:
+            return
+
+        batch, self._buffer = self._buffer, []
+        task = asyncio.create_task(self._send(batch))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _wait_for_broker(self) -> None:
+        started = time.perf_counter()
+
+        await self.connection.ready()
+        transport = self.connection.transport
+        if transport is not None:
+            # Resolves only while the broker has not sent connection.blocked.
+            await transport.connection.ready()
+
+        blocked = time.perf_counter() - started
+        if blocked > 0.1:
+            self.flow_control_seconds += blocked
+            logger.warning(f"Publishing was blocked by the broker for {blocked:.1f}s")
+
+    async def _send(
+        self, batch: List[Tuple[aio_pika.Message, str, asyncio.Future, float]]
+    ) -> None:
+        channel = await self._channels.get()
+        try:
+            await self._wait_for_broker()
+
+            if channel.is_closed:
+                channel = await self.connection.channel(publisher_confirms=True)
+
+            results = await asyncio.gather(
+                *(
+                    channel.default_exchange.publish(message, routing_key=routing_key)
+                    for message, routing_key, _, _ in batch
+                ),
+                return_exceptions=True,
+            )
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            self._channels.put_nowait(channel)
+
+        confirmed = time.perf_counter()
+        self.batches += 1
+        self.messages += len(batch)
+        publish_batch_size.observe(len(batch))
+
+        for (_, _, future, enqueued), result in zip(batch, results):
+            publish_latency.observe(confirmed - enqueued)
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                self.failures += 1
+                future.set_exception(result)
+            else:
+                future.set_result(None)
+
+    async def close(self) -> None:
+        self._flush()
+        if self._sending:
+            await asyncio.wait(self._sending)
+
+        while not self._channels.empty():
+            channel = self._channels.get_nowait()
+            if not channel.is_closed:
+                await channel.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "channels": self.channel_count,
+            "pending": self.pending,
+            "batches": self.batches,
+            "messages": self.messages,
+            "failures": self.failures,
+            "flow_control_seconds": round(self.flow_control_seconds, 3),
+            "latency": publish_latency.snapshot(),
+        }
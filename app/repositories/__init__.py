@@ -0,0 +1,16 @@
+from app.repositories.task import (
+    fetch_task,
+    transition_task,
+    transition_tasks,
+    update_progress,
+)
+from app.repositories.dependencies import announce_settled, settle_dependents
+
+__all__ = [
+    "fetch_task",
+    "transition_task",
+    "transition_tasks",
+    "update_progress",
+    "settle_dependents",
+    "announce_settled",
+]
@@ -0,0 +1,118 @@
+import logging
+from typing import List, Tuple
+
+import asyncpg
+
+from app.config import OUTBOX_NOTIFY_CHANNEL
+from app.metrics import counter
+from app.models.task import TaskStatus
+
+logger = logging.getLogger(__name__)
+
+dependents_settled = counter(
+    "task_dependents_settled",
+    "Dependent tasks released or cancelled when a parent task finished",
+    ("outcome",),
+)
+
+# Children waiting on a parent keep a pending_parents counter and their queue
+# message in task_waiting. Finishing parents touches only their direct edges:
+# one statement decrements the children (by the number of their parents that
+# finished together) and moves those that reached zero to the outbox.
+# Failures walk the graph one level per statement instead of a recursive
+# query, so every node is visited once however large the DAG is.
+RELEASE_DEPENDENTS_SQL = """
+WITH children AS (
+    UPDATE tasks t SET pending_parents = t.pending_parents - d.finished
+    FROM (
+        SELECT task_id, count(*) AS finished FROM task_dependencies
+        WHERE depends_on_id = ANY($1::int[]) GROUP BY task_id
+    ) d
+    WHERE t.id = d.task_id AND t.status = 'NEW'
+    RETURNING t.id, t.pending_parents
+), released AS (
+    DELETE FROM task_waiting w USING children c
+    WHERE w.task_id = c.id AND c.pending_parents = 0
+    RETURNING w.task_type, w.payload, w.priority, w.tenant
+), queued AS (
+    INSERT INTO task_outbox (task_type, payload, priority, tenant)
+    SELECT task_type, payload, priority, tenant FROM released
+    RETURNING 1
+)
+SELECT id, (SELECT count(*) FROM queued) AS queued FROM children
+"""
+
+CANCEL_DEPENDENTS_SQL = """
+WITH cancelled AS (
+    UPDATE tasks t SET status = 'CANCELLED',
+        completed_at = COALESCE(t.completed_at, now()),
+        error_info = $2
+    FROM task_dependencies d
+    WHERE d.depends_on_id = ANY($1::int[]) AND t.id = d.task_id AND t.status = 'NEW'
+    RETURNING t.id
+), dropped AS (
+    DELETE FROM task_waiting w USING cancelled c WHERE w.task_id = c.id
+)
+SELECT id FROM cancelled
+"""
+
+DROP_WAITING_SQL = "DELETE FROM task_waiting WHERE task_id = $1"
+
+
+async def release_dependents(
+    connection: asyncpg.Connection, task_ids: List[int]
+) -> List[int]:
+    rows = await connection.fetch(RELEASE_DEPENDENTS_SQL, task_ids)
+    released = rows[0]["queued"] if rows else 0
+    if released:
+        await connection.execute("SELECT pg_notify($1, '')", OUTBOX_NOTIFY_CHANNEL)
+        dependents_settled.labels("released").inc(released)
+    return [row["id"] for row in rows]
+
+
+async def cancel_dependents(
+    connection: asyncpg.Connection, task_id: int, reason: str
+) -> List[int]:
+    await connection.execute(DROP_WAITING_SQL, task_id)
+
+    cancelled = []
+    frontier = [task_id]
+    while frontier:
+        rows = await connection.fetch(CANCEL_DEPENDENTS_SQL, frontier, reason)
+        frontier = [row["id"] for row in rows]
+        cancelled.extend(frontier)
+
+    if cancelled:
+        dependents_settled.labels("cancelled").inc(len(cancelled))
+    return cancelled
+
+
+async def settle_dependents(
+    connection: asyncpg.Connection, task_ids: List[int], status: TaskStatus
+) -> List[Tuple[int, str]]:
+    # Returns every dependent row the statement changed with its new status,
+    # for announce_settled to publish once the transaction has committed.
+    if status == TaskStatus.COMPLETED:
+        children = await release_dependents(connection, task_ids)
+        return [(task_id, TaskStatus.NEW.value) for task_id in children]
+
+    settled = []
+    for task_id in task_ids:
+        reason = f"Dependency {task_id} {status.value.lower()}"
+        cancelled = await cancel_dependents(connection, task_id, reason)
+        if cancelled:
+            logger.info(f"Cancelled {len(cancelled)} tasks depending on task {task_id}")
+        settled.extend((child, TaskStatus.CANCELLED.value) for child in cancelled)
+    return settled
+
+
+def announce_settled(settled: List[Tuple[int, str]]) -> None:
+    # Cascaded changes never pass through a handler or an API call, so they
+    # get their events here: caches drop the rows and waiters wake up.
+    if not settled:
+        return
+
+    from app.events import notify_task_changed
+
+    for task_id, status in settled:
+        notify_task_changed(task_id, status)
@@ -0,0 +1,208 @@
+import time
+from typing import List, Optional, Tuple
+
+import asyncpg
+
+from app.database.pg import acquire
+from app.metrics import histogram
+from app.models.task import TaskStatus, FINAL_TASK_STATUSES, TASK_TRANSITIONS
+from app.repositories.dependencies import announce_settled, settle_dependents
+from app.results import encode_result, truncate_error
+
+transition_latency = histogram(
+    "task_transition_seconds",
+    "Latency of a task status transition in the database",
+    ("path", "status"),
+)
+
+# Worker hot path: plain SQL on the asyncpg pool, prepared once per
+# connection by asyncpg's statement cache. A connection is held for a single
+# statement, or a short transaction when the result is offloaded or the task
+# finishes and its dependents have to be settled. Mirrors transition_task in
+# app/services/task.py, which the API keeps using through the ORM.
+TASK_COLUMNS = "id, title, priority, status, started_at, completed_at"
+
+GET_TASK_SQL = f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = $1"
+
+
+def _build_transition_sql(status: TaskStatus, bulk: bool = False) -> str:
+    # The bulk form joins per-task values from unnest() arrays, so a batch of
+    # tasks changes status in one statement with the same rules.
+    if bulk:
+        task_id, result, error_info, size = (
+            "v.id",
+            "v.result",
+            "v.error_info",
+            "v.result_size",
+        )
+    else:
+        task_id, result, error_info, size = "$1", "$2", "$3", "$4::int"
+
+    assignments = [f"status = '{status.value}'"]
+
+    if status == TaskStatus.IN_PROGRESS:
+        assignments.append("started_at = COALESCE(t.started_at, now())")
+        assignments.append("attempts = t.attempts + 1")
+        assignments.append("progress = 0, progress_message = NULL")
+
+    if status in FINAL_TASK_STATUSES:
+        assignments.append("completed_at = COALESCE(t.completed_at, now())")
+
+    if status == TaskStatus.COMPLETED:
+        assignments.append("progress = 1")
+
+    assignments.append(
+        f"result = CASE WHEN {size} IS NULL THEN t.result ELSE {result} END"
+    )
+    assignments.append(f"result_size = COALESCE({size}, t.result_size)")
+    assignments.append(f"error_info = COALESCE({error_info}, t.error_info)")
+
+    sources = ", ".join(
+        f"'{source.value}'"
+        for source in sorted(TASK_TRANSITIONS[status], key=lambda s: s.value)
+    )
+    returning = ", ".join(f"t.{column}" for column in TASK_COLUMNS.split(", "))
+    values = (
+        "FROM unnest($1::int[], $2::text[], $3::text[], $4::int[]) "
+        "AS v(id, result, error_info, result_size) "
+        if bulk
+        else ""
+    )
+
+    return (
+        f"UPDATE tasks t SET {', '.join(assignments)} {values}"
+        f"WHERE t.id = {task_id} AND t.status IN ({sources}) "
+        f"RETURNING {returning}"
+    )
+
+
+TRANSITION_SQL = {status: _build_transition_sql(status) for status in TASK_TRANSITIONS}
+
+BULK_TRANSITION_SQL = {
+    status: _build_transition_sql(status, bulk=True) for status in TASK_TRANSITIONS
+}
+
+STORE_RESULT_SQL = (
+    "INSERT INTO task_results (task_id, encoding, size, data) "
+    "VALUES ($1, $2, $3, $4) "
+    "ON CONFLICT (task_id) DO UPDATE SET encoding = EXCLUDED.encoding, "
+    "size = EXCLUDED.size, data = EXCLUDED.data, created_at = now()"
+)
+
+UPDATE_PROGRESS_SQL = (
+    "UPDATE tasks t SET progress = v.progress, progress_message = v.message "
+    "FROM unnest($1::int[], $2::float8[], $3::text[]) AS v(id, progress, message) "
+    "WHERE t.id = v.id AND t.status = 'IN_PROGRESS' "
+    "RETURNING t.id, t.status, t.progress, t.progress_message"
+)
+
+
+async def fetch_task(task_id: int) -> Optional[asyncpg.Record]:
+    async with acquire() as connection:
+        return await connection.fetchrow(GET_TASK_SQL, task_id)
+
+
+async def transition_task(
+    task_id: int,
+    status: TaskStatus,
+    result: Optional[str] = None,
+    error_info: Optional[str] = None,
+) -> Optional[asyncpg.Record]:
+    encoded = encode_result(result) if result is not None else None
+    error_info = truncate_error(error_info)
+
+    started = time.perf_counter()
+    try:
+        async with acquire() as connection:
+            params = (
+                task_id,
+                encoded and encoded.inline,
+                error_info,
+                encoded and encoded.size,
+            )
+            offloaded = encoded is not None and encoded.data is not None
+
+            if not offloaded and status not in FINAL_TASK_STATUSES:
+                return await connection.fetchrow(TRANSITION_SQL[status], *params)
+
+            settled = []
+            async with connection.transaction():
+                row = await connection.fetchrow(TRANSITION_SQL[status], *params)
+                if row and offloaded:
+                    await connection.execute(
+                        STORE_RESULT_SQL,
+                        task_id,
+                        encoded.encoding,
+                        encoded.size,
+                        encoded.data,
+                    )
+                if row and status in FINAL_TASK_STATUSES:
+                    settled = await settle_dependents(connection, [task_id], status)
+            announce_settled(settled)
+            return row
+    finally:
+        transition_latency.labels("asyncpg", status.value).observe(
+            time.perf_counter() - started
+        )
+
+
+async def transition_tasks(
+    task_ids: List[int],
+    status: TaskStatus,
+    results: Optional[List[Optional[str]]] = None,
+    error_info: Optional[str] = None,
+) -> List[asyncpg.Record]:
+    if not task_ids:
+        return []
+
+    encoded = [
+        encode_result(result) if result is not None else None
+        for result in (results or [None] * len(task_ids))
+    ]
+    error_info = truncate_error(error_info)
+    offloaded = {
+        task_id: value
+        for task_id, value in zip(task_ids, encoded)
+        if value is not None and value.data is not None
+    }
+
+    started = time.perf_counter()
+    try:
+        async with acquire() as connection:
+            settled = []
+            async with connection.transaction():
+                rows = await connection.fetch(
+                    BULK_TRANSITION_SQL[status],
+                    task_ids,
+                    [value and value.inline for value in encoded],
+                    [error_info] * len(task_ids),
+                    [value and value.size for value in encoded],
+                )
+                changed = [row["id"] for row in rows]
+                changed_ids = set(changed)
+
+                stored = [
+                    (task_id, value.encoding, value.size, value.data)
+                    for task_id, value in offloaded.items()
+                    if task_id in changed_ids
+                ]
+                if stored:
+                    await connection.executemany(STORE_RESULT_SQL, stored)
+                if changed and status in FINAL_TASK_STATUSES:
+                    settled = await settle_dependents(connection, changed, status)
+            announce_settled(settled)
+            return rows
+    finally:
+        transition_latency.labels("asyncpg_bulk", status.value).observe(
+            time.perf_counter() - started
+        )
+
+
+async def update_progress(
+    updates: List[Tuple[int, float, Optional[str]]]
+) -> List[asyncpg.Record]:
+    task_ids, fractions, messages = zip(*updates)
+    async with acquire() as connection:
+        return await connection.fetch(
+            UPDATE_PROGRESS_SQL, list(task_ids), list(fractions), list(messages)
+        )
@@ -0,0 +1,84 @@
+import gzip
+import logging
+import zlib
+from typing import Iterator, NamedTuple, Optional
+
+from app.config import RESULT_INLINE_MAX_BYTES, RESULT_COMPRESSION, ERROR_INFO_MAX_BYTES
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+
+class EncodedResult(NamedTuple):
+    inline: Optional[str]
+    size: int
+    encoding: Optional[str] = None
+    data: Optional[bytes] = None
+
+
+def get_compression() -> str:
+    if RESULT_COMPRESSION == "zstd" and zstandard is None:
+        logger.warning("zstandard is not installed, compressing results with gzip")
+        return "gzip"
+    return RESULT_COMPRESSION
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "gzip":
+        return gzip.compress(data, mtime=0)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor().compress(data)
+    return data
+
+
+def encode_result(result: str) -> EncodedResult:
+    data = result.encode()
+    if len(data) <= RESULT_INLINE_MAX_BYTES:
+        return EncodedResult(result, len(data))
+
+    encoding = get_compression()
+    return EncodedResult(None, len(data), encoding, compress(data, encoding))
+
+
+def truncate_error(error_info: Optional[str]) -> Optional[str]:
+    if error_info is None:
+        return None
+
+    data = error_info.encode()
+    if len(data) <= ERROR_INFO_MAX_BYTES:
+        return error_info
+
+    # A traceback ends with the exception itself, so the tail is kept along
+    # with the head and only the middle frames are dropped.
+    half = ERROR_INFO_MAX_BYTES // 2
+    return (
+        data[:half].decode(errors="ignore")
+        + f"\n... {len(data) - 2 * half} bytes omitted ...\n"
+        + data[-half:].decode(errors="ignore")
+    )
+
+
+def iter_decompressed(data: bytes, encoding: str) -> Iterator[bytes]:
+    if encoding == "gzip":
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    elif encoding == "zstd":
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+    else:
+        for offset in range(0, len(data), CHUNK_SIZE):
+            yield data[offset : offset + CHUNK_SIZE]
+        return
+
+    for offset in range(0, len(data), CHUNK_SIZE):
+        chunk = decompressor.decompress(data[offset : offset + CHUNK_SIZE])
+        if chunk:
+            yield chunk
+
+    tail = decompressor.flush()
+    if tail:
+        yield tail
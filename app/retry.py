@@ -0,0 +1,31 @@
+import random
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 1.0,
+        multiplier: float = 2.0,
+        max_backoff: float = 300.0,
+        jitter: float = 0.1,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.multiplier = multiplier
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+
+    def should_retry(self, attempt: int) -> bool:
+        return attempt < self.max_attempts
+
+    def get_backoff(self, attempt: int) -> float:
+        return min(self.backoff * self.multiplier ** (attempt - 1), self.max_backoff)
+
+    def get_delay(self, attempt: int) -> float:
+        # Jitter only lengthens the delay, so every message in a retry queue
+        # expires within jitter of the queue's base backoff.
+        return self.get_backoff(attempt) * (1 + random.uniform(0, self.jitter))
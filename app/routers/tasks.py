@@ -1,13 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 
+from app.config import TASK_BATCH_MAX_SIZE, TASK_WAIT_MAX_TIMEOUT
 from app.database import get_db
+from app.events import parse_event_statuses, stream_task_events
+from app.models.task import TaskPriority, TaskStatus
+from app.pagination import get_next_cursor
+from app.results import iter_decompressed
 from app.schemas import TaskCreate, TaskResponse, TaskUpdate, BrokenTaskCreate
+from app.tenants import RateLimitExceeded
 from app.services import (
     create_task,
+    create_tasks,
+    create_quick_tasks,
     get_task,
+    get_cached_task,
+    wait_for_task,
+    get_task_result,
     get_tasks,
+    export_tasks,
+    get_export_fields,
     update_task,
     delete_task,
     cancel_task,
@@ -21,9 +36,58 @@ router = APIRouter(
 )
 
 
+def rate_limited(error: RateLimitExceeded) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=str(error),
+        headers={"Retry-After": str(math.ceil(error.retry_after))},
+    )
+
+
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
-    return await create_task(db=db, task=task)
+    try:
+        return await create_task(db=db, task=task)
+    except RateLimitExceeded as e:
+        raise rate_limited(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/batch", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED
+)
+async def create_new_tasks(tasks: List[TaskCreate], db: AsyncSession = Depends(get_db)):
+    if len(tasks) > TASK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds the limit of {TASK_BATCH_MAX_SIZE} tasks",
+        )
+    try:
+        return await create_tasks(db=db, tasks=tasks)
+    except RateLimitExceeded as e:
+        raise rate_limited(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post(
+    "/quick", response_model=List[TaskResponse], status_code=status.HTTP_201_CREATED
+)
+async def create_new_quick_tasks(
+    tasks: List[TaskCreate], db: AsyncSession = Depends(get_db)
+):
+    if len(tasks) > TASK_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch size exceeds the limit of {TASK_BATCH_MAX_SIZE} tasks",
+        )
+    try:
+        return await create_quick_tasks(db=db, tasks=tasks)
+    except RateLimitExceeded as e:
+        raise rate_limited(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post(
@@ -32,30 +96,138 @@ async def create_new_task(task: TaskCreate, db: AsyncSession = Depends(get_db)):
 async def create_new_broken_task(
     task: BrokenTaskCreate, db: AsyncSession = Depends(get_db)
 ):
-    return await create_broken_task(db=db, task=task)
+    try:
+        return await create_broken_task(db=db, task=task)
+    except RateLimitExceeded as e:
+        raise rate_limited(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/", response_model=List[TaskResponse])
 async def read_tasks(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
+    tenant: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
 ):
-    return await get_tasks(
-        db=db, skip=skip, limit=limit, status=status, priority=priority
+    try:
+        tasks = await get_tasks(
+            db=db,
+            skip=skip,
+            limit=limit,
+            status=status,
+            priority=priority,
+            cursor=cursor,
+            tenant=tenant,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_cursor = get_next_cursor(tasks, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return tasks
+
+
+@router.get("/export")
+async def export_all_tasks(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns"),
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    tenant: Optional[str] = None,
+):
+    # Everything is validated here: once the stream starts the 200 has been
+    # sent and an error can only cut the body short.
+    try:
+        export_fields = get_export_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+
+    return StreamingResponse(
+        export_tasks(
+            export_fields, format, status=status, priority=priority, tenant=tenant
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=tasks.{format}"},
+    )
+
+
+@router.get("/events")
+async def stream_events(
+    ids: Optional[str] = Query(None, description="Comma-separated task ids"),
+    status: Optional[str] = Query(None, description="Comma-separated statuses"),
+):
+    try:
+        task_ids = {int(value) for value in ids.split(",")} if ids else None
+        statuses = parse_event_statuses(status) if status else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return StreamingResponse(
+        stream_task_events(task_ids, statuses),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
 @router.get("/{task_id}", response_model=TaskResponse)
-async def read_task(task_id: int, db: AsyncSession = Depends(get_db)):
-    db_task = await get_task(db=db, task_id=task_id)
+async def read_task(task_id: int):
+    db_task = await get_cached_task(task_id=task_id)
     if db_task is None:
         raise HTTPException(status_code=404, detail="Task not found")
     return db_task
 
 
+@router.get("/{task_id}/wait", response_model=TaskResponse)
+async def wait_task(
+    task_id: int,
+    timeout: float = Query(30, ge=0, le=TASK_WAIT_MAX_TIMEOUT),
+):
+    db_task = await wait_for_task(task_id=task_id, timeout=timeout)
+    if db_task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return db_task
+
+
+@router.get("/{task_id}/result")
+async def read_task_result(
+    task_id: int, request: Request, db: AsyncSession = Depends(get_db)
+):
+    found = await get_task_result(db=db, task_id=task_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    db_task, stored = found
+    if stored is None:
+        if db_task.result is None:
+            raise HTTPException(status_code=404, detail="Task has no result")
+        return PlainTextResponse(db_task.result)
+
+    headers = {"X-Result-Size": str(stored.size)}
+    if stored.encoding == "gzip" and "gzip" in request.headers.get(
+        "accept-encoding", ""
+    ):
+        headers["Content-Encoding"] = "gzip"
+        return Response(
+            stored.data, media_type="text/plain; charset=utf-8", headers=headers
+        )
+
+    return StreamingResponse(
+        iter_decompressed(stored.data, stored.encoding),
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
+
+
 @router.put("/{task_id}", response_model=TaskResponse)
 async def update_existing_task(
     task_id: int, task: TaskUpdate, db: AsyncSession = Depends(get_db)
@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Set, Tuple
+
+import asyncpg
+from sqlalchemy import delete, func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.config import (
+    SCHEDULER_LOOKAHEAD,
+    SCHEDULER_BATCH_SIZE,
+    SCHEDULER_NOTIFY_CHANNEL,
+    OUTBOX_NOTIFY_CHANNEL,
+)
+from app.database.database import AsyncSessionLocal
+from app.database.pg import get_dsn
+from app.models.outbox import OutboxMessage
+from app.models.schedule import ScheduledMessage
+from app.outbox import wake_outbox_relay
+
+logger = logging.getLogger(__name__)
+
+# Timers for scheduled messages due before _horizon, loaded from the
+# scheduled_at index. Rows further out stay in the database until a later
+# reload brings them into the window.
+_timers: List[Tuple[datetime, int]] = []
+_known: Set[int] = set()
+_horizon: Optional[datetime] = None
+_wakeup: Optional[asyncio.Event] = None
+_reload_requested = False
+
+
+def add_timers(entries: List[Tuple[datetime, int]]) -> None:
+    # Without a scheduler loop in this process nothing would pop the timers;
+    # the process running it picks the rows up from the table instead.
+    if _wakeup is None:
+        return
+
+    added = False
+    for scheduled_at, message_id in entries:
+        if message_id in _known:
+            continue
+        if _horizon is not None and scheduled_at > _horizon:
+            continue
+        heapq.heappush(_timers, (scheduled_at, message_id))
+        _known.add(message_id)
+        added = True
+
+    if added:
+        _wakeup.set()
+
+
+def request_reload() -> None:
+    global _reload_requested
+
+    _reload_requested = True
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def listen_schedule_notifications() -> Optional[asyncpg.Connection]:
+    try:
+        connection = await asyncpg.connect(get_dsn())
+        await connection.add_listener(
+            SCHEDULER_NOTIFY_CHANNEL, lambda *args: request_reload()
+        )
+        return connection
+    except Exception as e:
+        logger.warning(
+            f"Could not listen on {SCHEDULER_NOTIFY_CHANNEL}, "
+            f"relying on periodic reloads: {str(e)}"
+        )
+        return None
+
+
+async def load_scheduled(
+    db: AsyncSession, until: datetime
+) -> List[Tuple[datetime, int]]:
+    result = await db.execute(
+        select(ScheduledMessage.scheduled_at, ScheduledMessage.id)
+        .where(ScheduledMessage.scheduled_at <= until)
+        .order_by(ScheduledMessage.scheduled_at)
+        .limit(SCHEDULER_BATCH_SIZE)
+    )
+    return [(scheduled_at, message_id) for scheduled_at, message_id in result.all()]
+
+
+async def release_scheduled(db: AsyncSession, message_ids: List[int]) -> int:
+    result = await db.execute(
+        delete(ScheduledMessage)
+        .where(ScheduledMessage.id.in_(message_ids))
+        .returning(
+            ScheduledMessage.task_type,
+            ScheduledMessage.payload,
+            ScheduledMessage.priority,
+            ScheduledMessage.tenant,
+        )
+    )
+    rows = result.all()
+
+    if rows:
+        await db.execute(
+            insert(OutboxMessage),
+            [
+                {
+                    "task_type": task_type,
+                    "payload": payload,
+                    "priority": priority,
+                    "tenant": tenant,
+                }
+                for task_type, payload, priority, tenant in rows
+            ],
+        )
+        await db.execute(select(func.pg_notify(OUTBOX_NOTIFY_CHANNEL, "")))
+    await db.commit()
+    return len(rows)
+
+
+async def reload_timers(now: datetime) -> datetime:
+    global _horizon
+
+    until = now + timedelta(seconds=SCHEDULER_LOOKAHEAD)
+    async with AsyncSessionLocal() as db:
+        entries = await load_scheduled(db, until)
+
+    _horizon = None
+    add_timers(entries)
+
+    if len(entries) == SCHEDULER_BATCH_SIZE:
+        _horizon = entries[-1][0]
+        return _horizon
+
+    _horizon = until
+    return now + timedelta(seconds=SCHEDULER_LOOKAHEAD / 2)
+
+
+async def run_scheduler() -> None:
+    global _wakeup
+
+    _wakeup = asyncio.Event()
+    logger.info(f"Starting scheduler with lookahead: {SCHEDULER_LOOKAHEAD}s")
+
+    # Tasks scheduled by other processes announce themselves with NOTIFY, so
+    # a near-term timer is loaded right away instead of on the next reload.
+    listener = await listen_schedule_notifications()
+    try:
+        await schedule_loop()
+    finally:
+        if listener is not None:
+            await listener.close()
+
+
+async def schedule_loop() -> None:
+    global _reload_requested
+
+    reload_at = datetime.now(timezone.utc)
+
+    while True:
+        _wakeup.clear()
+        now = datetime.now(timezone.utc)
+
+        try:
+            if now >= reload_at or _reload_requested:
+                _reload_requested = False
+                reload_at = await reload_timers(now)
+
+            due = []
+            while _timers and _timers[0][0] <= now:
+                _, message_id = heapq.heappop(_timers)
+                _known.discard(message_id)
+                due.append(message_id)
+
+            if due:
+                async with AsyncSessionLocal() as db:
+                    released = await release_scheduled(db, due)
+                if released:
+                    logger.info(f"Released {released} scheduled tasks")
+                    wake_outbox_relay()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error releasing scheduled tasks: {str(e)}")
+            reload_at = now + timedelta(seconds=1)
+
+        wake_at = min(_timers[0][0], reload_at) if _timers else reload_at
+        timeout = (wake_at - datetime.now(timezone.utc)).total_seconds()
+
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=max(timeout, 0))
+        except asyncio.TimeoutError:
+            pass
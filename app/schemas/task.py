@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import List, Optional
 from datetime import datetime
 from app.models.task import TaskStatus, TaskPriority
 
@@ -11,10 +11,25 @@ class TaskBase(BaseModel):
 
 
 class TaskCreate(TaskBase):
-    pass
+    tenant: str = Field(
+        "default", min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_.-]+$"
+    )
+    run_at: Optional[datetime] = None
+    delay: Optional[float] = Field(None, ge=0, description="Delay in seconds")
+    depends_on: List[int] = Field(
+        default_factory=list, description="Tasks that must complete first"
+    )
 
+    @model_validator(mode="after")
+    def check_schedule(self):
+        if self.run_at is not None and self.delay is not None:
+            raise ValueError("Specify either run_at or delay, not both")
+        if self.depends_on and (self.run_at is not None or self.delay is not None):
+            raise ValueError("Scheduled tasks cannot have dependencies")
+        return self
 
-class BrokenTaskCreate(TaskBase):
+
+class BrokenTaskCreate(TaskCreate):
     force_error: bool = True
 
 
@@ -36,10 +51,18 @@ class InternalTaskUpdate(BaseModel):
 class TaskResponse(TaskBase):
     id: int
     status: TaskStatus
+    tenant: str = "default"
+    attempts: int = 0
+    pending_parents: int = 0
     created_at: datetime
+    scheduled_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
+    progress: Optional[float] = None
+    progress_message: Optional[str] = None
     result: Optional[str] = None
+    result_size: Optional[int] = None
+    result_ref: Optional[str] = None
     error_info: Optional[str] = None
 
     class Config:
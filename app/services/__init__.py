@@ -1,19 +1,36 @@
 from app.services.task import (
     get_task,
+    get_cached_task,
+    wait_for_task,
+    get_task_result,
     get_tasks,
+    export_tasks,
+    get_export_fields,
     create_task,
+    create_tasks,
+    create_quick_tasks,
     update_task,
     delete_task,
     cancel_task,
     create_broken_task,
 )
+from app.services.counters import get_task_counters, rebuild_task_counters
 
 __all__ = [
     "get_task",
+    "get_cached_task",
+    "wait_for_task",
+    "get_task_result",
     "get_tasks",
+    "export_tasks",
+    "get_export_fields",
     "create_task",
+    "create_tasks",
+    "create_quick_tasks",
     "update_task",
     "delete_task",
     "cancel_task",
     "create_broken_task",
+    "get_task_counters",
+    "rebuild_task_counters",
 ]
@@ -0,0 +1,26 @@
+from sqlalchemy import delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models.counters import TaskCounter, REBUILD_TASK_COUNTERS_SQL
+
+
+async def get_task_counters(db: AsyncSession):
+    query = select(
+        TaskCounter.status,
+        TaskCounter.priority,
+        func.sum(TaskCounter.task_count),
+        func.sum(TaskCounter.timed_count),
+        func.sum(TaskCounter.time_sum),
+        func.min(TaskCounter.time_min),
+        func.max(TaskCounter.time_max),
+    ).group_by(TaskCounter.status, TaskCounter.priority)
+    result = await db.execute(query)
+    return result.all()
+
+
+async def rebuild_task_counters(db: AsyncSession) -> None:
+    await db.execute(text("LOCK TABLE tasks IN SHARE MODE"))
+    await db.execute(delete(TaskCounter))
+    await db.execute(text(REBUILD_TASK_COUNTERS_SQL))
+    await db.commit()
@@ -1,15 +1,48 @@
+import asyncio
+import csv
+import io
+import json
+import logging
+import time
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from datetime import datetime
-from typing import Optional, Dict, Any, Union
-
-from app.models.task import Task, TaskStatus, TaskPriority
+from sqlalchemy import update, insert, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, Union, List, AsyncIterator
+
+from app.models.task import (
+    Task,
+    TaskStatus,
+    TaskPriority,
+    TASK_TRANSITIONS,
+    FINAL_TASK_STATUSES,
+)
+from app.config import (
+    TASK_EXPORT_BATCH_SIZE,
+    OUTBOX_NOTIFY_CHANNEL,
+    SCHEDULER_NOTIFY_CHANNEL,
+)
+from app.database.database import AsyncSessionLocal
+from app.database.pg import get_session_connection
+from app.models.dependency import TaskDependency, WaitingMessage
+from app.models.outbox import OutboxMessage
+from app.models.result import TaskResult
+from app.models.schedule import ScheduledMessage
+from app.pagination import paginate_tasks
+from app.repositories.dependencies import announce_settled, settle_dependents
+from app.repositories.task import transition_latency
+from app.results import encode_result, truncate_error
 from app.schemas.task import (
     TaskCreate,
     TaskUpdate,
     BrokenTaskCreate,
     InternalTaskUpdate,
+    TaskResponse,
 )
+from app.tenants import tenant_limiter
+
+logger = logging.getLogger(__name__)
 
 
 async def get_task(db: AsyncSession, task_id: int):
@@ -17,12 +50,56 @@ async def get_task(db: AsyncSession, task_id: int):
     return result.scalars().first()
 
 
+async def load_task_response(task_id: int) -> Optional[TaskResponse]:
+    async with AsyncSessionLocal() as db:
+        db_task = await get_task(db, task_id)
+        return TaskResponse.model_validate(db_task) if db_task else None
+
+
+async def get_cached_task(task_id: int) -> Optional[TaskResponse]:
+    from app.events import task_cache
+
+    return await task_cache.get_or_load(task_id, lambda: load_task_response(task_id))
+
+
+async def wait_for_task(task_id: int, timeout: float) -> Optional[TaskResponse]:
+    from app.events import DELETED_EVENT, event_hub, wait_for_event
+
+    # Subscribe before reading the current state so a transition landing in
+    # between is not missed. Only final events cause another (cached) read.
+    subscription = event_hub.subscribe(ids={task_id})
+    try:
+        task = await get_cached_task(task_id)
+        if task is None or task.status in FINAL_TASK_STATUSES:
+            return task
+
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+
+            item = await wait_for_event(subscription, remaining)
+            if item is None:
+                break
+
+            status = item[0]["status"]
+            if status in FINAL_TASK_STATUSES or status == DELETED_EVENT:
+                break
+
+        return await get_cached_task(task_id)
+    finally:
+        event_hub.unsubscribe(subscription)
+
+
 async def get_tasks(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
     status: Optional[str] = None,
     priority: Optional[str] = None,
+    cursor: Optional[str] = None,
+    tenant: Optional[str] = None,
 ):
     query = select(Task)
 
@@ -32,116 +109,436 @@ async def get_tasks(
     if priority:
         query = query.filter(Task.priority == priority)
 
-    query = query.offset(skip).limit(limit)
+    if tenant:
+        query = query.filter(Task.tenant == tenant)
+
+    query = paginate_tasks(query, cursor, limit)
+
+    if skip and not cursor:
+        query = query.offset(skip)
+
     result = await db.execute(query)
     return result.scalars().all()
 
 
-async def create_task(db: AsyncSession, task: TaskCreate):
-    db_task = Task(
-        title=task.title,
-        description=task.description,
-        priority=task.priority,
-        status=TaskStatus.NEW,
-    )
-    db.add(db_task)
-    await db.commit()
-    await db.refresh(db_task)
+EXPORT_FIELDS = [column.name for column in Task.__table__.columns]
+
+
+def get_export_fields(fields: Optional[str]) -> List[str]:
+    if not fields:
+        return EXPORT_FIELDS
+
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in EXPORT_FIELDS]
+    if unknown or not selected:
+        raise ValueError(f"Unknown export fields: {', '.join(unknown) or fields}")
+
+    return selected
+
+
+def _export_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (TaskStatus, TaskPriority)):
+        return value.value
+    return value
+
+
+async def export_tasks(
+    fields: List[str],
+    export_format: str = "ndjson",
+    status: Optional[TaskStatus] = None,
+    priority: Optional[TaskPriority] = None,
+    tenant: Optional[str] = None,
+) -> AsyncIterator[bytes]:
+    query = select(*[getattr(Task, field) for field in fields]).order_by(Task.id)
+
+    if status:
+        query = query.filter(Task.status == status)
 
-    from app.worker import publish_task
+    if priority:
+        query = query.filter(Task.priority == priority)
 
-    priority_value = (
+    if tenant:
+        query = query.filter(Task.tenant == tenant)
+
+    query = query.execution_options(yield_per=TASK_EXPORT_BATCH_SIZE)
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        yield buffer.getvalue().encode()
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+
+        async for rows in result.partitions():
+            if export_format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerows([[_export_value(v) for v in row] for row in rows])
+                yield buffer.getvalue().encode()
+            else:
+                yield "".join(
+                    json.dumps(
+                        {field: _export_value(v) for field, v in zip(fields, row)}
+                    )
+                    + "\n"
+                    for row in rows
+                ).encode()
+
+
+def get_priority_value(priority: TaskPriority) -> int:
+    return (
         10
-        if db_task.priority == TaskPriority.HIGH
-        else (5 if db_task.priority == TaskPriority.MEDIUM else 1)
+        if priority == TaskPriority.HIGH
+        else (5 if priority == TaskPriority.MEDIUM else 1)
     )
 
-    await publish_task(
-        task_type="process_task",
-        payload={"task_id": db_task.id},
-        priority=priority_value,
+
+def get_scheduled_at(task: TaskCreate) -> Optional[datetime]:
+    now = datetime.now(timezone.utc)
+
+    if task.delay is not None:
+        scheduled_at = now + timedelta(seconds=task.delay)
+    elif task.run_at is not None:
+        scheduled_at = task.run_at
+        if scheduled_at.tzinfo is None:
+            scheduled_at = scheduled_at.replace(tzinfo=timezone.utc)
+    else:
+        return None
+
+    return scheduled_at if scheduled_at > now else None
+
+
+async def load_parents(
+    db: AsyncSession, tasks: List[Union[TaskCreate, BrokenTaskCreate]]
+) -> Dict[int, TaskStatus]:
+    parent_ids = {parent_id for task in tasks for parent_id in task.depends_on}
+    if not parent_ids:
+        return {}
+
+    # FOR SHARE keeps a parent from finishing until the new edges are
+    # committed, so its completion always sees the children it has to release.
+    result = await db.execute(
+        select(Task.id, Task.status)
+        .where(Task.id.in_(parent_ids))
+        .with_for_update(read=True)
     )
+    parents = dict(result.all())
+
+    missing = parent_ids - parents.keys()
+    if missing:
+        raise ValueError(f"Unknown dependencies: {sorted(missing)}")
+    return parents
+
+
+def get_dependency_values(
+    task: TaskCreate, parents: Dict[int, TaskStatus]
+) -> Dict[str, Any]:
+    depends_on = set(task.depends_on)
+
+    for parent_id in sorted(depends_on):
+        status = parents[parent_id]
+        if status in (TaskStatus.FAILED, TaskStatus.CANCELLED):
+            return {
+                "status": TaskStatus.CANCELLED,
+                "completed_at": datetime.now(timezone.utc),
+                "error_info": f"Dependency {parent_id} {status.value.lower()}",
+            }
+
+    pending = [
+        parent_id
+        for parent_id in depends_on
+        if parents[parent_id] != TaskStatus.COMPLETED
+    ]
+    return {"status": TaskStatus.NEW, "pending_parents": len(pending)}
+
+
+async def enqueue_tasks(
+    db: AsyncSession, tasks: List[Union[TaskCreate, BrokenTaskCreate]], task_type: str
+) -> List[Task]:
+    if not tasks:
+        return []
+
+    tenant_limiter.admit(task.tenant for task in tasks)
+
+    parents = await load_parents(db, tasks)
+
+    result = await db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        [
+            {
+                "title": task.title,
+                "description": task.description,
+                "priority": task.priority,
+                "tenant": task.tenant,
+                "status": TaskStatus.NEW,
+                "pending_parents": 0,
+                "completed_at": None,
+                "error_info": None,
+                "scheduled_at": get_scheduled_at(task),
+                **get_dependency_values(task, parents),
+            }
+            for task in tasks
+        ],
+    )
+    db_tasks = result.all()
+
+    edges = [
+        {"depends_on_id": parent_id, "task_id": db_task.id}
+        for task, db_task in zip(tasks, db_tasks)
+        for parent_id in set(task.depends_on)
+    ]
+    if edges:
+        await db.execute(insert(TaskDependency), edges)
+
+    queued = [db_task for db_task in db_tasks if db_task.status == TaskStatus.NEW]
+    waiting = [db_task for db_task in queued if db_task.pending_parents]
+    immediate = [
+        db_task
+        for db_task in queued
+        if not db_task.pending_parents and db_task.scheduled_at is None
+    ]
+    scheduled = [db_task for db_task in queued if db_task.scheduled_at is not None]
+
+    if waiting:
+        await db.execute(
+            insert(WaitingMessage),
+            [
+                {
+                    "task_id": db_task.id,
+                    "task_type": task_type,
+                    "payload": {"task_id": db_task.id},
+                    "priority": get_priority_value(db_task.priority),
+                    "tenant": db_task.tenant,
+                }
+                for db_task in waiting
+            ],
+        )
+
+    if immediate:
+        await db.execute(
+            insert(OutboxMessage),
+            [
+                {
+                    "task_type": task_type,
+                    "payload": {"task_id": db_task.id},
+                    "priority": get_priority_value(db_task.priority),
+                    "tenant": db_task.tenant,
+                }
+                for db_task in immediate
+            ],
+        )
+        await db.execute(select(func.pg_notify(OUTBOX_NOTIFY_CHANNEL, "")))
+
+    timers = []
+    if scheduled:
+        result = await db.execute(
+            insert(ScheduledMessage).returning(
+                ScheduledMessage.scheduled_at, ScheduledMessage.id
+            ),
+            [
+                {
+                    "task_type": task_type,
+                    "payload": {"task_id": db_task.id},
+                    "priority": get_priority_value(db_task.priority),
+                    "tenant": db_task.tenant,
+                    "scheduled_at": db_task.scheduled_at,
+                }
+                for db_task in scheduled
+            ],
+        )
+        timers = [(scheduled_at, message_id) for scheduled_at, message_id in result]
+        await db.execute(select(func.pg_notify(SCHEDULER_NOTIFY_CHANNEL, "")))
 
-    return db_task
+    await db.commit()
+
+    from app.outbox import wake_outbox_relay
+    from app.scheduler import add_timers
+
+    if immediate:
+        wake_outbox_relay()
+    if timers:
+        add_timers(timers)
+
+    return db_tasks
+
+
+async def create_task(db: AsyncSession, task: TaskCreate):
+    db_tasks = await enqueue_tasks(db, [task], "process_task")
+    return db_tasks[0]
+
+
+async def create_tasks(db: AsyncSession, tasks: List[TaskCreate]) -> List[Task]:
+    return await enqueue_tasks(db, tasks, "process_task")
+
+
+async def create_quick_tasks(db: AsyncSession, tasks: List[TaskCreate]) -> List[Task]:
+    return await enqueue_tasks(db, tasks, "process_quick_task")
 
 
 async def create_broken_task(db: AsyncSession, task: BrokenTaskCreate):
-    db_task = Task(
-        title=task.title,
-        description=task.description,
-        priority=task.priority,
-        status=TaskStatus.NEW,
+    db_tasks = await enqueue_tasks(db, [task], "process_broken_task")
+    return db_tasks[0]
+
+
+async def transition_task(
+    db: AsyncSession, task_id: int, status: TaskStatus, **values
+) -> Optional[Task]:
+    values["status"] = status
+
+    if status == TaskStatus.IN_PROGRESS:
+        values["started_at"] = func.coalesce(Task.started_at, func.now())
+        values["attempts"] = Task.attempts + 1
+        values["progress"] = 0
+        values["progress_message"] = None
+
+    if status in FINAL_TASK_STATUSES:
+        values["completed_at"] = func.coalesce(Task.completed_at, func.now())
+
+    if status == TaskStatus.COMPLETED:
+        values["progress"] = 1
+
+    if values.get("error_info") is not None:
+        values["error_info"] = truncate_error(values["error_info"])
+
+    encoded = None
+    if values.get("result") is not None:
+        encoded = encode_result(values["result"])
+        values["result"] = encoded.inline
+        values["result_size"] = encoded.size
+
+    query = (
+        update(Task)
+        .where(Task.id == task_id, Task.status.in_(TASK_TRANSITIONS[status]))
+        .values(**values)
+        .returning(Task)
+        .execution_options(populate_existing=True)
     )
-    db.add(db_task)
+    started = time.perf_counter()
+    result = await db.execute(query)
+    db_task = result.scalars().first()
+    if db_task and encoded and encoded.data is not None:
+        await store_task_result(db, task_id, encoded)
+    settled = []
+    if db_task and status in FINAL_TASK_STATUSES:
+        settled = await settle_dependents(
+            await get_session_connection(db), [task_id], status
+        )
     await db.commit()
-    await db.refresh(db_task)
-
-    from app.worker import publish_task
+    announce_settled(settled)
+    transition_latency.labels("orm", status.value).observe(
+        time.perf_counter() - started
+    )
 
-    await publish_task(task_type="process_broken_task", payload={"task_id": db_task.id})
+    if db_task:
+        from app.events import notify_task_changed
 
+        notify_task_changed(task_id, status.value)
     return db_task
 
 
+async def store_task_result(db: AsyncSession, task_id: int, encoded) -> None:
+    query = pg_insert(TaskResult).values(
+        task_id=task_id, encoding=encoded.encoding, size=encoded.size, data=encoded.data
+    )
+    await db.execute(
+        query.on_conflict_do_update(
+            index_elements=[TaskResult.task_id],
+            set_={
+                "encoding": query.excluded.encoding,
+                "size": query.excluded.size,
+                "data": query.excluded.data,
+                "created_at": func.now(),
+            },
+        )
+    )
+
+
+async def get_task_result(db: AsyncSession, task_id: int):
+    task = await get_task(db, task_id)
+    if not task:
+        return None
+
+    stored = await db.get(TaskResult, task_id)
+    return task, stored
+
+
 async def update_task(
     db: AsyncSession, task_id: int, task: Union[TaskUpdate, InternalTaskUpdate]
 ):
-    db_task = await get_task(db, task_id)
-
     update_data = task.dict(exclude_unset=True)
 
     if isinstance(task, InternalTaskUpdate) and "status" in update_data:
-        new_status = update_data["status"]
-
-        if (
-            new_status == TaskStatus.IN_PROGRESS
-            and db_task.status != TaskStatus.IN_PROGRESS
-        ):
-            update_data["started_at"] = datetime.now()
+        new_status = update_data.pop("status")
+        return await transition_task(db, task_id, new_status, **update_data)
 
-        if (
-            new_status
-            in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
-            and db_task.completed_at is None
-        ):
-            update_data["completed_at"] = datetime.now()
+    if not update_data:
+        return await get_task(db, task_id)
 
-    for key, value in update_data.items():
-        setattr(db_task, key, value)
+    if update_data.get("error_info") is not None:
+        update_data["error_info"] = truncate_error(update_data["error_info"])
 
+    query = (
+        update(Task)
+        .where(Task.id == task_id)
+        .values(**update_data)
+        .returning(Task)
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(query)
+    db_task = result.scalars().first()
     await db.commit()
-    await db.refresh(db_task)
+
+    if db_task:
+        from app.events import notify_task_changed
+
+        notify_task_changed(task_id, db_task.status.value)
     return db_task
 
 
 async def delete_task(db: AsyncSession, task_id: int):
     db_task = await get_task(db, task_id)
+    settled = []
+    if db_task.status not in FINAL_TASK_STATUSES:
+        settled = await settle_dependents(
+            await get_session_connection(db), [task_id], TaskStatus.CANCELLED
+        )
     await db.delete(db_task)
     await db.commit()
+    announce_settled(settled)
+
+    from app.events import DELETED_EVENT, notify_task_changed
+
+    notify_task_changed(task_id, DELETED_EVENT)
     return db_task
 
 
 async def cancel_task(db: AsyncSession, task_id: int) -> Dict[str, Any]:
-    db_task = await get_task(db, task_id)
+    db_task = await transition_task(
+        db,
+        task_id,
+        TaskStatus.CANCELLED,
+        result=f"Task was cancelled at {datetime.now().isoformat()}",
+    )
 
     if not db_task:
-        return {"success": False, "message": "Task not found"}
+        db_task = await get_task(db, task_id)
+
+        if not db_task:
+            return {"success": False, "message": "Task not found"}
 
-    if db_task.status in [
-        TaskStatus.COMPLETED,
-        TaskStatus.FAILED,
-        TaskStatus.CANCELLED,
-    ]:
         return {
             "success": False,
             "message": f"Task is already in final state: {db_task.status}",
         }
 
-    task_update = InternalTaskUpdate(
-        status=TaskStatus.CANCELLED,
-        result=f"Task was cancelled at {datetime.now().isoformat()}",
-    )
+    from app.worker import publish_cancellation, publish_in_background
 
-    await update_task(db=db, task_id=task_id, task=task_update)
+    publish_in_background(
+        publish_cancellation(task_id), f"cancellation for task {task_id}"
+    )
 
     return {"success": True, "message": "Task cancelled successfully"}
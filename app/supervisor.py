@@ -0,0 +1,69 @@
+import asyncio
+import logging
+import multiprocessing
+import signal
+import time
+from typing import Dict
+
+from app.config import WORKER_HTTP_PORT, WORKER_RESTART_DELAY
+from app.worker import start_worker
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker_process(index: int) -> None:
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    http_port = WORKER_HTTP_PORT + index if WORKER_HTTP_PORT else 0
+    logger.info(f"Starting worker process {index}")
+    asyncio.run(start_worker(http_port=http_port))
+
+
+def run_supervisor(processes: int) -> None:
+    children: Dict[int, multiprocessing.Process] = {}
+    stopping = False
+
+    def start_child(index: int) -> None:
+        process = multiprocessing.Process(
+            target=run_worker_process, args=(index,), name=f"worker-{index}"
+        )
+        process.start()
+        children[index] = process
+
+    def stop_children(signum, frame) -> None:
+        nonlocal stopping
+
+        if stopping:
+            return
+        stopping = True
+        logger.info(f"Stopping {len(children)} worker processes")
+        for process in children.values():
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGTERM, stop_children)
+    signal.signal(signal.SIGINT, stop_children)
+
+    logger.info(f"Starting supervisor with {processes} worker processes")
+    for index in range(processes):
+        start_child(index)
+
+    while children:
+        time.sleep(WORKER_RESTART_DELAY)
+
+        for index, process in list(children.items()):
+            if process.is_alive():
+                continue
+
+            process.join()
+            del children[index]
+
+            if not stopping:
+                logger.warning(
+                    f"Worker process {index} exited with code {process.exitcode}, "
+                    "restarting"
+                )
+                start_child(index)
+
+    logger.info("All worker processes stopped")
@@ -1,172 +1,168 @@
 import logging
 import asyncio
 from datetime import datetime
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-
-from app.worker import register_task_handler
-from app.database.database import AsyncSessionLocal
-from app.models.task import Task, TaskStatus
-from app.schemas.task import InternalTaskUpdate
+from typing import Any, Dict, List
+
+from app.worker import (
+    register_task_handler,
+    register_failure_handler,
+    register_retry_handler,
+    publish_task_event,
+    get_cancel_event,
+    release_cancel_event,
+)
+from app.models.task import TaskStatus
+from app.progress import ProgressReporter
+from app.repositories.task import fetch_task, transition_task, transition_tasks
+from app.retry import RetryPolicy
 
 logger = logging.getLogger(__name__)
 
 
-async def get_db_session():
-    db = AsyncSessionLocal()
-    try:
-        return db
-    except Exception as e:
-        await db.close()
-        raise e
-
-
-async def get_task(db: AsyncSession, task_id: int):
-    result = await db.execute(select(Task).filter(Task.id == task_id))
-    return result.scalars().first()
-
-
 async def set_task_status(
-    db: AsyncSession, task_id: int, status: TaskStatus, result=None, error_info=None
+    task_id: int, status: TaskStatus, result=None, error_info=None
 ):
-    task_update = InternalTaskUpdate(status=status)
+    task = await transition_task(
+        task_id, status, result=result or None, error_info=error_info or None
+    )
+    if task:
+        await publish_task_event(
+            task_id,
+            status.value,
+            started_at=task["started_at"],
+            completed_at=task["completed_at"],
+        )
+    return task
 
-    if result:
-        task_update.result = result
 
-    if error_info:
-        task_update.error_info = error_info
+async def start_task(task_id: int):
+    task = await set_task_status(task_id, TaskStatus.PENDING)
+    if task:
+        return task, None
 
-    task = await get_task(db, task_id)
+    task = await fetch_task(task_id)
     if not task:
-        return None
+        logger.error(f"Task {task_id} not found")
+        return None, {"status": "error", "message": f"Task {task_id} not found"}
 
-    update_data = task_update.dict(exclude_unset=True)
+    if task["status"] == TaskStatus.CANCELLED:
+        logger.info(f"Task {task_id} was cancelled before processing")
+        return None, {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
 
-    if "status" in update_data:
-        new_status = update_data["status"]
+    logger.info(f"Task {task_id} is already {task['status']}, skipping")
+    return None, {
+        "status": "skipped",
+        "message": f"Task {task_id} is already {task['status']}",
+    }
 
-        if (
-            new_status == TaskStatus.IN_PROGRESS
-            and task.status != TaskStatus.IN_PROGRESS
-        ):
-            task.started_at = datetime.now()
 
-        if (
-            new_status
-            in [TaskStatus.COMPLETED, TaskStatus.FAILED, TaskStatus.CANCELLED]
-            and task.completed_at is None
-        ):
-            task.completed_at = datetime.now()
+@register_failure_handler
+async def mark_task_failed(task_type: str, payload: Dict[str, Any], error_message: str):
+    task_id = payload.get("task_id")
+    if task_id is None:
+        return
 
-    for key, value in update_data.items():
-        setattr(task, key, value)
+    await set_task_status(task_id, TaskStatus.FAILED, error_info=error_message)
 
-    await db.commit()
-    await db.refresh(task)
-    return task
+
+@register_retry_handler
+async def mark_task_retrying(
+    task_type: str,
+    payload: Dict[str, Any],
+    error_message: str,
+    attempt: int,
+    delay: float,
+):
+    task_id = payload.get("task_id")
+    if task_id is None:
+        return
+
+    await set_task_status(task_id, TaskStatus.PENDING, error_info=error_message)
 
 
-@register_task_handler("process_task")
-async def process_task(task_id: int):
+@register_task_handler(
+    "process_task",
+    timeout=60,
+    retry=RetryPolicy(max_attempts=5, backoff=2),
+    progress=True,
+)
+async def process_task(task_id: int, progress: ProgressReporter):
     logger.info(f"Processing task {task_id}")
 
-    db = await get_db_session()
+    cancelled = get_cancel_event(task_id)
     try:
-        task = await get_task(db, task_id)
+        task, outcome = await start_task(task_id)
         if not task:
-            logger.error(f"Task {task_id} not found")
-            return {"status": "error", "message": f"Task {task_id} not found"}
+            return outcome
 
-        if task.status == TaskStatus.CANCELLED:
-            logger.info(f"Task {task_id} was cancelled before processing")
-            return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
-
-        await set_task_status(db, task_id, TaskStatus.PENDING)
-
-        task = await get_task(db, task_id)
-        if task.status == TaskStatus.CANCELLED:
-            logger.info(f"Task {task_id} was cancelled while setting status to PENDING")
-            return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
+        priority = task["priority"]
 
-        await set_task_status(db, task_id, TaskStatus.IN_PROGRESS)
-
-        task = await get_task(db, task_id)
-        if task.status == TaskStatus.CANCELLED:
+        task = await set_task_status(task_id, TaskStatus.IN_PROGRESS)
+        if cancelled.is_set() or not task:
             logger.info(
                 f"Task {task_id} was cancelled while setting status to IN_PROGRESS"
             )
             return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
 
-        if task.priority == "HIGH":
+        if priority == "HIGH":
             processing_time = 5
-        elif task.priority == "MEDIUM":
+        elif priority == "MEDIUM":
             processing_time = 10
         else:
             processing_time = 15
 
         for i in range(processing_time):
-            task = await get_task(db, task_id)
-            if task.status == TaskStatus.CANCELLED:
-                logger.info(f"Task {task_id} was cancelled during processing")
-                return {
-                    "status": "cancelled",
-                    "message": f"Task {task_id} was cancelled",
-                }
-
-            await asyncio.sleep(1)
-            logger.info(f"Task {task_id} progress: {i+1}/{processing_time}")
-
-        task = await get_task(db, task_id)
-        if task.status == TaskStatus.CANCELLED:
-            logger.info(f"Task {task_id} was cancelled before completion")
-            return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
+            try:
+                await asyncio.wait_for(cancelled.wait(), timeout=1)
+            except asyncio.TimeoutError:
+                progress.report((i + 1) / processing_time, f"{i+1}/{processing_time}")
+                continue
+
+            logger.info(f"Task {task_id} was cancelled during processing")
+            return {
+                "status": "cancelled",
+                "message": f"Task {task_id} was cancelled",
+            }
 
         result = (
             f"Task {task_id} completed successfully at {datetime.now().isoformat()}"
         )
-        await set_task_status(db, task_id, TaskStatus.COMPLETED, result=result)
+        task = await set_task_status(task_id, TaskStatus.COMPLETED, result=result)
+        if not task:
+            logger.info(f"Task {task_id} was cancelled before completion")
+            return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
 
         return {"status": "success", "result": result}
-
-    except Exception as e:
-        error_message = f"Error processing task {task_id}: {str(e)}"
-        logger.error(error_message)
-        await set_task_status(db, task_id, TaskStatus.FAILED, error_info=error_message)
-        return {"status": "error", "message": error_message}
     finally:
-        await db.close()
+        release_cancel_event(task_id)
 
 
-@register_task_handler("process_broken_task")
+@register_task_handler("process_broken_task", timeout=30, weight=2)
 async def process_broken_task(task_id: int):
     logger.info(f"Processing broken task {task_id}")
 
-    db = await get_db_session()
+    cancelled = get_cancel_event(task_id)
     try:
-        task = await get_task(db, task_id)
+        task, outcome = await start_task(task_id)
         if not task:
-            logger.error(f"Task {task_id} not found")
-            return {"status": "error", "message": f"Task {task_id} not found"}
+            return outcome
 
-        if task.status == TaskStatus.CANCELLED:
-            logger.info(f"Task {task_id} was cancelled before processing")
+        task = await set_task_status(task_id, TaskStatus.IN_PROGRESS)
+        if cancelled.is_set() or not task:
+            logger.info(
+                f"Task {task_id} was cancelled while setting status to IN_PROGRESS"
+            )
             return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
 
-        await set_task_status(db, task_id, TaskStatus.PENDING)
-
-        task = await get_task(db, task_id)
-        if task.status == TaskStatus.CANCELLED:
-            logger.info(f"Task {task_id} was cancelled while setting status to PENDING")
+        try:
+            await asyncio.wait_for(cancelled.wait(), timeout=2)
+            logger.info(f"Task {task_id} was cancelled during processing")
             return {"status": "cancelled", "message": f"Task {task_id} was cancelled"}
-
-        await set_task_status(db, task_id, TaskStatus.IN_PROGRESS)
-
-        await asyncio.sleep(2)
+        except asyncio.TimeoutError:
+            pass
 
         result = "This task was deliberately broken"
         await set_task_status(
-            db,
             task_id,
             TaskStatus.FAILED,
             result=result,
@@ -177,11 +173,43 @@ async def process_broken_task(task_id: int):
             "status": "error",
             "message": "This task is deliberately broken and will always fail",
         }
-
-    except Exception as e:
-        error_message = f"Error processing task {task_id}: {str(e)}"
-        logger.error(error_message)
-        await set_task_status(db, task_id, TaskStatus.FAILED, error_info=error_message)
-        return {"status": "error", "message": error_message}
     finally:
-        await db.close()
+        release_cancel_event(task_id)
+
+
+@register_task_handler(
+    "process_quick_task",
+    timeout=30,
+    retry=RetryPolicy(max_attempts=3),
+    batch_size=500,
+    max_wait_ms=50,
+)
+async def process_quick_tasks(payloads: List[Dict[str, Any]]):
+    task_ids = [payload["task_id"] for payload in payloads]
+    logger.info(f"Processing {len(task_ids)} quick tasks")
+
+    started = await transition_tasks(task_ids, TaskStatus.PENDING)
+    started = await transition_tasks(
+        [task["id"] for task in started], TaskStatus.IN_PROGRESS
+    )
+
+    task_ids = [task["id"] for task in started]
+    completed_at = datetime.now().isoformat()
+    completed = await transition_tasks(
+        task_ids,
+        TaskStatus.COMPLETED,
+        results=[f"Task {task_id} completed at {completed_at}" for task_id in task_ids],
+    )
+
+    await asyncio.gather(
+        *(
+            publish_task_event(
+                task["id"],
+                task["status"],
+                started_at=task["started_at"],
+                completed_at=task["completed_at"],
+            )
+            for task in completed
+        )
+    )
+    return {"status": "success", "completed": len(completed)}
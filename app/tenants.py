@@ -0,0 +1,142 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+from app.config import (
+    TENANT_WEIGHTS,
+    TENANT_RATE_LIMIT,
+    TENANT_RATE_BURST,
+    TENANT_RATE_LIMITS,
+)
+from app.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+MAX_TRACKED_TENANTS = 10000
+
+tasks_admitted = counter("tenant_tasks_admitted", "Task creations admitted")
+tasks_throttled = counter(
+    "tenant_tasks_throttled", "Task creations rejected by a tenant rate limit"
+)
+
+
+def parse_tenant_values(value: str) -> Dict[str, float]:
+    values = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        tenant, _, number = item.partition("=")
+        try:
+            values[tenant.strip()] = float(number)
+        except ValueError:
+            logger.warning(f"Ignoring invalid tenant setting: {item}")
+    return values
+
+
+tenant_weights = parse_tenant_values(TENANT_WEIGHTS)
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, tenant: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for tenant {tenant}")
+        self.tenant = tenant
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, now: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, tokens: int) -> float:
+        # A request larger than the burst is let through once the bucket is
+        # full and leaves it in debt, instead of never fitting at all.
+        missing = min(tokens, self.burst) - self.tokens
+        return max(missing, 0) / self.rate
+
+    def is_full(self) -> bool:
+        return self.tokens >= self.burst
+
+
+class TenantRateLimiter:
+    # Per-process admission control in front of task creation. Each tenant
+    # gets its own bucket, so a producer that exhausts its budget is turned
+    # away with a 429 before its tasks reach the database or the broker.
+    def __init__(
+        self, rate: float, burst: int, overrides: Optional[Dict[str, float]] = None
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def get_rate(self, tenant: str) -> float:
+        return self.overrides.get(tenant, self.rate)
+
+    def admit(self, tenants: Iterable[str]) -> None:
+        counts: Dict[str, int] = {}
+        for tenant in tenants:
+            counts[tenant] = counts.get(tenant, 0) + 1
+
+        now = time.monotonic()
+        buckets = {}
+        for tenant, tokens in counts.items():
+            if self.get_rate(tenant) <= 0:
+                continue
+
+            bucket = self._get_bucket(tenant, now)
+            bucket.refill(now)
+            retry_after = bucket.wait_time(tokens)
+            if retry_after > 0:
+                tasks_throttled.inc(sum(counts.values()))
+                raise RateLimitExceeded(tenant, retry_after)
+            buckets[tenant] = bucket
+
+        # Nothing is taken until every tenant in a batch fits, so a rejected
+        # batch does not use up anyone's budget.
+        for tenant, bucket in buckets.items():
+            bucket.tokens -= counts[tenant]
+        tasks_admitted.inc(sum(counts.values()))
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        for bucket in self._buckets.values():
+            bucket.refill(now)
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "overrides": self.overrides,
+            "throttled_tenants": sorted(
+                tenant for tenant, bucket in self._buckets.items() if bucket.tokens < 1
+            ),
+            "tracked_tenants": len(self._buckets),
+        }
+
+    def _get_bucket(self, tenant: str, now: float) -> TokenBucket:
+        bucket = self._buckets.get(tenant)
+        if bucket is not None:
+            return bucket
+
+        if len(self._buckets) >= MAX_TRACKED_TENANTS:
+            # A full bucket behaves exactly like a new one, so those can go.
+            for name, existing in list(self._buckets.items()):
+                existing.refill(now)
+                if existing.is_full():
+                    del self._buckets[name]
+
+        bucket = self._buckets[tenant] = TokenBucket(
+            self.get_rate(tenant), self.burst, now
+        )
+        return bucket
+
+
+tenant_limiter = TenantRateLimiter(
+    TENANT_RATE_LIMIT, TENANT_RATE_BURST, parse_tenant_values(TENANT_RATE_LIMITS)
+)
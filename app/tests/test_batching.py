@@ -0,0 +1,76 @@
+import asyncio
+
+from app.batching import Batcher
+
+
+def test_full_batch_flushes_at_once():
+    flushed = []
+
+    async def scenario():
+        batcher = Batcher(3, 60, flushed.append)
+        for item in range(7):
+            batcher.add(item)
+        return len(batcher)
+
+    assert asyncio.run(scenario()) == 1
+    assert flushed == [[0, 1, 2], [3, 4, 5]]
+
+
+def test_partial_batch_flushes_after_max_wait():
+    flushed = []
+
+    async def scenario():
+        batcher = Batcher(100, 0.01, flushed.append)
+        batcher.add("a")
+        batcher.add("b")
+        assert flushed == []
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+    assert flushed == [["a", "b"]]
+
+
+def test_max_wait_counts_from_first_item_of_each_batch():
+    flushed = []
+
+    async def scenario():
+        batcher = Batcher(2, 0.01, flushed.append)
+        batcher.add(1)
+        batcher.add(2)
+        batcher.add(3)
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+    assert flushed == [[1, 2], [3]]
+
+
+def test_flush_without_items_does_nothing():
+    flushed = []
+
+    async def scenario():
+        batcher = Batcher(2, 0.01, flushed.append)
+        batcher.flush()
+        batcher.add(1)
+        batcher.flush()
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+
+    assert flushed == [[1]]
+
+
+def test_clear_returns_items_without_flushing():
+    flushed = []
+
+    async def scenario():
+        batcher = Batcher(10, 0.01, flushed.append)
+        batcher.add(1)
+        batcher.add(2)
+        items = batcher.clear()
+        await asyncio.sleep(0.05)
+        return items, len(batcher)
+
+    assert asyncio.run(scenario()) == ([1, 2], 0)
+    assert flushed == []
@@ -0,0 +1,96 @@
+import asyncio
+
+from app.cache import TTLCache
+
+
+def counting_loader(calls, value, delay=0.0):
+    async def load():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+
+    return load
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache(60)
+    calls = []
+
+    async def scenario():
+        load = counting_loader(calls, "task", delay=0.01)
+        return await asyncio.gather(*(cache.get_or_load(1, load) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["task"] * 5
+    assert calls == ["task"]
+
+
+def test_hit_skips_loader_until_ttl_expires():
+    calls = []
+
+    async def scenario():
+        cache = TTLCache(60)
+        await cache.get_or_load(1, counting_loader(calls, "first"))
+        cached = await cache.get_or_load(1, counting_loader(calls, "second"))
+
+        expired = TTLCache(0)
+        await expired.get_or_load(1, counting_loader(calls, "third"))
+        reloaded = await expired.get_or_load(1, counting_loader(calls, "fourth"))
+        return cached, reloaded
+
+    assert asyncio.run(scenario()) == ("first", "fourth")
+    assert calls == ["first", "third", "fourth"]
+
+
+def test_invalidate_discards_load_in_progress():
+    cache = TTLCache(60)
+    calls = []
+
+    async def scenario():
+        stale = asyncio.ensure_future(
+            cache.get_or_load(1, counting_loader(calls, "stale", delay=0.01))
+        )
+        await asyncio.sleep(0)
+        cache.invalidate(1)
+        fresh = await cache.get_or_load(1, counting_loader(calls, "fresh"))
+        await stale
+        again = await cache.get_or_load(1, counting_loader(calls, "never"))
+        return fresh, again
+
+    assert asyncio.run(scenario()) == ("fresh", "fresh")
+    assert calls == ["stale", "fresh"]
+
+
+def test_failed_load_is_not_cached():
+    cache = TTLCache(60)
+    calls = []
+
+    async def fail():
+        calls.append("fail")
+        raise RuntimeError("database is down")
+
+    async def scenario():
+        try:
+            await cache.get_or_load(1, fail)
+        except RuntimeError:
+            pass
+        return await cache.get_or_load(1, counting_loader(calls, "task"))
+
+    assert asyncio.run(scenario()) == "task"
+    assert calls == ["fail", "task"]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(60, maxsize=2)
+    calls = []
+
+    async def scenario():
+        await cache.get_or_load(1, counting_loader(calls, 1))
+        await cache.get_or_load(2, counting_loader(calls, 2))
+        await cache.get_or_load(1, counting_loader(calls, "unused"))
+        await cache.get_or_load(3, counting_loader(calls, 3))
+        await cache.get_or_load(1, counting_loader(calls, "unused"))
+        await cache.get_or_load(2, counting_loader(calls, "reloaded"))
+
+    asyncio.run(scenario())
+
+    assert calls == [1, 2, 3, "reloaded"]
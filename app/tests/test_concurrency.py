@@ -0,0 +1,75 @@
+import random
+
+from app.concurrency import ConcurrencyController
+from app.dispatch import Dispatcher
+
+DURATIONS = {10: 5.0, 5: 10.0, 1: 15.0}
+
+
+def make_controller(limit=16):
+    dispatcher = Dispatcher(limit)
+
+    async def apply_limit(limit):
+        pass
+
+    controller = ConcurrencyController(
+        dispatcher, apply_limit, min_limit=1, max_limit=64, latency_tolerance=1.5
+    )
+    return dispatcher, controller
+
+
+def run_interval(dispatcher, controller, samples):
+    for task_type, latency, priority in samples:
+        controller.record(task_type, latency, priority=priority)
+    controller._saturated = True
+    dispatcher.limit = controller.next_limit()
+
+
+def test_priority_mix_is_not_overload():
+    rng = random.Random(1)
+    dispatcher, controller = make_controller()
+
+    for _ in range(20):
+        samples = []
+        for _ in range(20):
+            priority = rng.choice(list(DURATIONS))
+            latency = DURATIONS[priority] * rng.uniform(0.95, 1.05)
+            samples.append(("process_task", latency, priority))
+        run_interval(dispatcher, controller, samples)
+        assert not controller.last_decision.startswith("decrease")
+
+    assert dispatcher.limit == 36
+
+
+def test_varying_durations_within_priority_are_not_overload():
+    rng = random.Random(2)
+    dispatcher, controller = make_controller()
+
+    for _ in range(20):
+        samples = [("process_task", rng.choice([5.0, 15.0]), 5) for _ in range(20)]
+        run_interval(dispatcher, controller, samples)
+
+    assert dispatcher.limit > 16
+
+
+def test_latency_rise_decreases_limit():
+    dispatcher, controller = make_controller()
+
+    for _ in range(5):
+        run_interval(dispatcher, controller, [("process_task", 5.0, 10)] * 20)
+    limit = dispatcher.limit
+
+    run_interval(dispatcher, controller, [("process_task", 10.0, 10)] * 20)
+
+    assert controller.last_decision.startswith("decrease")
+    assert dispatcher.limit == int(limit * 0.75)
+
+
+def test_errors_decrease_limit():
+    dispatcher, controller = make_controller()
+
+    for _ in range(10):
+        controller.record("process_task", 5.0, error=True)
+    controller._saturated = True
+
+    assert controller.next_limit() == 12
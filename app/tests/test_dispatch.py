@@ -0,0 +1,107 @@
+import asyncio
+from collections import Counter
+
+from app.dispatch import Dispatcher
+
+
+def run_in_order(dispatcher, requests, limit=1):
+    # Every request waits on the dispatcher before any slot exists, then the
+    # slots are opened and each grant is recorded and released at once.
+    order = []
+
+    async def run(label, task_type, priority, tenant=None):
+        await dispatcher.acquire(task_type, priority, tenant)
+        order.append(label)
+        dispatcher.release(task_type)
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(run(*request)) for request in requests]
+        await asyncio.sleep(0)
+        dispatcher.set_limit(limit)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    return order
+
+
+def test_task_types_share_slots_by_weight():
+    dispatcher = Dispatcher(0)
+    dispatcher.configure("heavy", weight=3)
+    dispatcher.configure("light", weight=1)
+    requests = [("heavy", "heavy", 0)] * 8 + [("light", "light", 0)] * 8
+
+    order = run_in_order(dispatcher, requests)
+
+    assert Counter(order[:8]) == {"heavy": 6, "light": 2}
+
+
+def test_concurrency_cap_holds_back_extra_tasks():
+    dispatcher = Dispatcher(10)
+    dispatcher.configure("export", concurrency=2)
+
+    async def scenario():
+        tasks = [asyncio.ensure_future(dispatcher.acquire("export")) for _ in range(5)]
+        await asyncio.sleep(0)
+        state = dispatcher.snapshot()["task_types"]["export"]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        return state["running"], state["waiting"]
+
+    assert asyncio.run(scenario()) == (2, 3)
+
+
+def test_priority_orders_messages_of_one_type():
+    dispatcher = Dispatcher(0)
+    requests = [
+        ("low", "report", 0),
+        ("high", "report", 10),
+        ("medium", "report", 5),
+    ]
+
+    assert run_in_order(dispatcher, requests) == ["high", "medium", "low"]
+
+
+def test_returning_task_type_does_not_bank_credit():
+    dispatcher = Dispatcher(0)
+    run_in_order(dispatcher, [("busy", "busy", 0)] * 6)
+    dispatcher.set_limit(0)
+    order = run_in_order(
+        dispatcher, [("busy", "busy", 0)] * 4 + [("idle", "idle", 0)] * 4
+    )
+
+    assert Counter(order[:4]) == {"busy": 2, "idle": 2}
+
+
+def test_high_priority_backlog_does_not_starve_other_tenants():
+    dispatcher = Dispatcher(0)
+    requests = [("big", "report", 10, "big")] * 6 + [
+        ("small", "report", 0, "small")
+    ] * 3
+
+    order = run_in_order(dispatcher, requests)
+
+    assert Counter(order[:6]) == {"big": 3, "small": 3}
+
+
+def test_tenants_share_slots_by_weight():
+    dispatcher = Dispatcher(0, tenant_weights={"acme": 2})
+    requests = [("acme", "report", 0, "acme")] * 9 + [
+        ("default", "report", 0, None)
+    ] * 9
+
+    order = run_in_order(dispatcher, requests)
+
+    assert Counter(order[:9]) == {"acme": 6, "default": 3}
+
+
+def test_returning_tenant_does_not_bank_credit():
+    dispatcher = Dispatcher(0)
+    run_in_order(dispatcher, [("busy", "report", 0, "busy")] * 6)
+    dispatcher.set_limit(0)
+    order = run_in_order(
+        dispatcher,
+        [("busy", "report", 0, "busy")] * 4 + [("idle", "report", 0, "idle")] * 4,
+    )
+
+    assert Counter(order[:4]) == {"busy": 2, "idle": 2}
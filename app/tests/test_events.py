@@ -0,0 +1,106 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import app.events as events
+import app.services.task as task_service
+from app.repositories.dependencies import announce_settled
+
+
+def deliver_locally(monkeypatch):
+    # Stand in for the broker round trip: the published event comes straight
+    # back through the API process's task_events consumer.
+    async def publish_task_event(task_id, status, **fields):
+        body = json.dumps({"task_id": task_id, "status": status, **fields})
+        await events.process_task_event(SimpleNamespace(body=body.encode()))
+
+    monkeypatch.setattr(events, "publish_task_event", publish_task_event)
+
+
+def test_cascaded_cancellation_wakes_waiter(monkeypatch):
+    deliver_locally(monkeypatch)
+    statuses = {7: "NEW"}
+
+    async def get_cached_task(task_id):
+        return SimpleNamespace(id=task_id, status=statuses[task_id])
+
+    monkeypatch.setattr(task_service, "get_cached_task", get_cached_task)
+
+    async def scenario():
+        waiter = asyncio.ensure_future(task_service.wait_for_task(7, timeout=5))
+        await asyncio.sleep(0)
+
+        statuses[7] = "CANCELLED"
+        announce_settled([(7, "CANCELLED")])
+        return await asyncio.wait_for(waiter, timeout=1)
+
+    task = asyncio.run(scenario())
+
+    assert task.status == "CANCELLED"
+    assert events.event_hub.count() == 0
+
+
+def test_cascaded_changes_reach_event_stream(monkeypatch):
+    deliver_locally(monkeypatch)
+
+    async def scenario():
+        stream = events.stream_task_events(ids={3, 4})
+        assert await anext(stream) == ": connected\n\n"
+
+        announce_settled([(3, "NEW"), (4, "CANCELLED"), (5, "CANCELLED")])
+        received = [await anext(stream), await anext(stream)]
+        await stream.aclose()
+        return received
+
+    received = asyncio.run(scenario())
+
+    assert [json.loads(item.split("data: ")[1]) for item in received] == [
+        {"task_id": 3, "status": "NEW"},
+        {"task_id": 4, "status": "CANCELLED"},
+    ]
+    assert events.event_hub.count() == 0
+
+
+def test_cascaded_changes_invalidate_cache(monkeypatch):
+    deliver_locally(monkeypatch)
+    events.task_cache.set(9, "stale")
+
+    async def load():
+        return "fresh"
+
+    async def scenario():
+        announce_settled([(9, "CANCELLED")])
+        await asyncio.sleep(0)
+        return await events.task_cache.get_or_load(9, load)
+
+    assert asyncio.run(scenario()) == "fresh"
+
+
+def test_event_status_filter_accepts_deleted():
+    assert events.parse_event_statuses("completed, DELETED") == {
+        "COMPLETED",
+        "DELETED",
+    }
+    with pytest.raises(ValueError):
+        events.parse_event_statuses("COMPLETED,GONE")
+
+
+def test_deleted_events_reach_filtered_stream(monkeypatch):
+    deliver_locally(monkeypatch)
+
+    async def scenario():
+        stream = events.stream_task_events(statuses={"DELETED"})
+        await anext(stream)
+
+        events.notify_task_changed(2, "COMPLETED")
+        events.notify_task_changed(2, "DELETED")
+        received = await anext(stream)
+        await stream.aclose()
+        return received
+
+    assert json.loads(asyncio.run(scenario()).split("data: ")[1]) == {
+        "task_id": 2,
+        "status": "DELETED",
+    }
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import app.progress as progress
+import app.worker as worker
+from app.progress import ProgressReporter, flush_progress
+
+
+def record_writes(monkeypatch):
+    written = {}
+
+    async def update_progress(updates):
+        rows = []
+        for task_id, fraction, message in updates:
+            written[task_id] = (fraction, message)
+            rows.append(
+                {
+                    "id": task_id,
+                    "status": "IN_PROGRESS",
+                    "progress": fraction,
+                    "progress_message": message,
+                }
+            )
+        return rows
+
+    async def publish_task_event(task_id, status, **fields):
+        pass
+
+    monkeypatch.setattr(progress, "update_progress", update_progress)
+    monkeypatch.setattr(worker, "publish_task_event", publish_task_event)
+    monkeypatch.setattr(progress, "_pending", {})
+    return written
+
+
+def test_reports_between_flushes_are_coalesced(monkeypatch):
+    written = record_writes(monkeypatch)
+    reporter = ProgressReporter(1)
+
+    reporter.report(0.2)
+    reporter.report(1.5, "almost" * 100)
+
+    assert asyncio.run(flush_progress()) == 1
+    assert written == {1: (1.0, ("almost" * 100)[:255])}
+    assert asyncio.run(flush_progress()) == 0
+
+
+def test_reports_from_threads_survive_concurrent_flushes(monkeypatch):
+    written = record_writes(monkeypatch)
+    task_ids = range(20000)
+
+    def report_all():
+        for task_id in task_ids:
+            ProgressReporter(task_id).report(0.5)
+
+    async def scenario():
+        thread = threading.Thread(target=report_all)
+        thread.start()
+        while thread.is_alive():
+            await flush_progress()
+            await asyncio.sleep(0)
+        thread.join()
+        await flush_progress()
+
+    asyncio.run(scenario())
+
+    assert set(written) == set(task_ids)
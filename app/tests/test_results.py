@@ -0,0 +1,42 @@
+import gzip
+
+from app.config import ERROR_INFO_MAX_BYTES, RESULT_INLINE_MAX_BYTES
+from app.results import encode_result, truncate_error
+
+
+def test_small_result_stays_inline():
+    assert encode_result("done") == ("done", 4, None, None)
+
+
+def test_large_result_is_compressed_out_of_line():
+    result = "x" * (RESULT_INLINE_MAX_BYTES + 1)
+
+    encoded = encode_result(result)
+
+    assert encoded.inline is None
+    assert encoded.size == len(result)
+    assert encoded.encoding == "gzip"
+    assert gzip.decompress(encoded.data).decode() == result
+
+
+def test_short_error_is_kept():
+    assert truncate_error("ValueError: boom") == "ValueError: boom"
+    assert truncate_error(None) is None
+
+
+def test_long_error_keeps_head_and_tail():
+    error_info = "Traceback\n" + "  frame\n" * 1000 + "ValueError: boom"
+
+    truncated = truncate_error(error_info)
+
+    assert len(truncated.encode()) < ERROR_INFO_MAX_BYTES + 64
+    assert truncated.startswith("Traceback\n")
+    assert truncated.endswith("ValueError: boom")
+    assert "bytes omitted" in truncated
+
+
+def test_truncation_does_not_split_characters():
+    truncated = truncate_error("ошибка " * 1000)
+
+    assert truncated.startswith("ошибка")
+    assert truncated.encode().decode() == truncated
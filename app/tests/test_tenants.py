@@ -0,0 +1,89 @@
+import pytest
+
+import app.tenants as tenants
+from app.tenants import (
+    RateLimitExceeded,
+    TenantRateLimiter,
+    TokenBucket,
+    parse_tenant_values,
+)
+
+
+def freeze_time(monkeypatch, now):
+    monkeypatch.setattr(tenants.time, "monotonic", lambda: now[0])
+
+
+def test_bucket_refills_up_to_burst():
+    bucket = TokenBucket(rate=10, burst=5, now=0)
+    bucket.tokens = 0
+
+    bucket.refill(0.2)
+    assert bucket.tokens == pytest.approx(2)
+
+    bucket.refill(10)
+    assert bucket.tokens == 5
+    assert bucket.is_full()
+
+
+def test_bucket_wait_time():
+    bucket = TokenBucket(rate=10, burst=5, now=0)
+    bucket.tokens = 1
+
+    assert bucket.wait_time(1) == 0
+    assert bucket.wait_time(3) == pytest.approx(0.2)
+    assert bucket.wait_time(50) == pytest.approx(0.4)
+
+
+def test_limiter_rejects_tenant_over_its_budget(monkeypatch):
+    now = [100.0]
+    freeze_time(monkeypatch, now)
+    limiter = TenantRateLimiter(rate=10, burst=5)
+
+    limiter.admit(["acme"] * 5)
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit(["acme"])
+    assert error.value.tenant == "acme"
+    assert error.value.retry_after == pytest.approx(0.1)
+
+    limiter.admit(["beta"])
+    now[0] += 0.5
+    limiter.admit(["acme"] * 5)
+
+
+def test_rejected_batch_takes_no_tokens(monkeypatch):
+    freeze_time(monkeypatch, [100.0])
+    limiter = TenantRateLimiter(rate=10, burst=5)
+
+    limiter.admit(["beta"] * 4)
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit(["acme"] * 2 + ["beta"] * 2 + ["acme"] * 2)
+    assert error.value.tenant == "beta"
+    limiter.admit(["acme"] * 5)
+    limiter.admit(["beta"])
+
+
+def test_batch_larger_than_burst_needs_full_bucket(monkeypatch):
+    freeze_time(monkeypatch, [100.0])
+    limiter = TenantRateLimiter(rate=10, burst=5)
+
+    limiter.admit(["acme"] * 8)
+    with pytest.raises(RateLimitExceeded) as error:
+        limiter.admit(["acme"] * 8)
+    assert error.value.retry_after == pytest.approx(0.8)
+
+
+def test_overrides_and_unlimited_tenants(monkeypatch):
+    freeze_time(monkeypatch, [100.0])
+    limiter = TenantRateLimiter(rate=0, burst=1, overrides={"acme": 1})
+
+    limiter.admit(["beta"] * 1000)
+    limiter.admit(["acme"])
+    with pytest.raises(RateLimitExceeded):
+        limiter.admit(["acme"])
+
+
+def test_parse_tenant_values_skips_invalid_items():
+    assert parse_tenant_values("acme=2, beta=0.5,,broken=x") == {
+        "acme": 2.0,
+        "beta": 0.5,
+    }
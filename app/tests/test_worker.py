@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import app.worker as worker
+
+
+class FakeMessage:
+    def __init__(self, delivery_tag, body=None):
+        self.delivery_tag = delivery_tag
+        self.body = json.dumps(body or {}).encode()
+        self.headers = {}
+        self.priority = 0
+        self.redelivered = False
+        self.acks = []
+        self.nacks = []
+
+    async def ack(self, multiple=False):
+        self.acks.append(multiple)
+
+    async def nack(self, requeue=True):
+        self.nacks.append(requeue)
+
+
+def test_message_without_handler_fails_task(monkeypatch):
+    dead_letters = []
+    failures = []
+
+    async def dead_letter(message, reason, attempt=0):
+        dead_letters.append(reason)
+
+    async def report_failure(task_type, payload, error_message):
+        failures.append((task_type, payload, error_message))
+
+    monkeypatch.setattr(worker, "dead_letter", dead_letter)
+    monkeypatch.setattr(worker, "report_failure", report_failure)
+    message = FakeMessage(1, {"task_type": "unknown", "payload": {"task_id": 5}})
+
+    assert asyncio.run(worker.handle_message(message)) is False
+
+    assert dead_letters == ["No handler registered for unknown"]
+    assert failures == [
+        ("unknown", {"task_id": 5}, "No handler registered for unknown")
+    ]
+    assert message.acks == [False]
+
+
+def ack_batch(monkeypatch, batch_tags, other_tags):
+    messages = [FakeMessage(tag) for tag in batch_tags]
+    monkeypatch.setattr(worker, "_unacked", set(batch_tags) | set(other_tags))
+    asyncio.run(worker.ack_batch(messages))
+    return {message.delivery_tag: message.acks for message in messages}
+
+
+def test_ack_batch_uses_one_multiple_ack(monkeypatch):
+    acks = ack_batch(monkeypatch, [3, 1, 2], [])
+
+    assert acks == {1: [], 2: [], 3: [True]}
+
+
+def test_ack_batch_does_not_cover_other_deliveries(monkeypatch):
+    acks = ack_batch(monkeypatch, [1, 2, 4, 5], [3, 7])
+
+    assert acks == {1: [], 2: [True], 4: [False], 5: [False]}
+
+
+def test_ack_batch_acks_singly_above_older_delivery(monkeypatch):
+    acks = ack_batch(monkeypatch, [5, 6], [2])
+
+    assert acks == {5: [False], 6: [False]}
+
+
+def test_prefetch_limit_changes_window_in_place(monkeypatch):
+    calls = []
+
+    class FakeChannel:
+        async def set_qos(self, **kwargs):
+            calls.append(kwargs)
+
+    async def get_channel():
+        return FakeChannel()
+
+    monkeypatch.setattr(worker, "get_channel", get_channel)
+    monkeypatch.setattr(worker, "_batchers", {})
+    monkeypatch.setattr(worker, "_consumers", [("queue", "consumer")])
+
+    asyncio.run(worker.set_prefetch_limit(8))
+
+    assert calls == [
+        {"prefetch_count": 8 * worker.TASK_PREFETCH_MULTIPLIER, "global_": True}
+    ]
+    assert worker._consumers == [("queue", "consumer")]
+
+
+def test_drain_requeues_buffered_batch_messages(monkeypatch):
+    started = []
+
+    async def scenario():
+        batcher = worker.Batcher(10, 60, started.append)
+        messages = [FakeMessage(tag) for tag in (1, 2)]
+        for message in messages:
+            batcher.add((message, {}))
+        monkeypatch.setattr(worker, "_batchers", {"quick": batcher})
+        await worker.drain_worker()
+        return messages
+
+    monkeypatch.setattr(worker, "_draining", False)
+    monkeypatch.setattr(worker, "_consumers", [])
+    monkeypatch.setattr(worker, "_in_flight", {})
+    monkeypatch.setattr(worker, "_unacked", {1, 2})
+
+    messages = asyncio.run(scenario())
+
+    assert started == []
+    assert [message.nacks for message in messages] == [[True], [True]]
+    assert worker._unacked == set()
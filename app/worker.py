@@ -1,16 +1,105 @@
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Callable, Optional
+import signal
+import time
+import zlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Awaitable, Dict, Any, Callable, Optional, List, Tuple
 import aio_pika
 from aio_pika.abc import AbstractIncomingMessage
-from app.config import RABBITMQ_URL, TASK_QUEUE_NAME, TASK_CONCURRENCY
+from app.config import (
+    RABBITMQ_URL,
+    TASK_QUEUE_NAME,
+    TASK_QUEUE_SHARDS,
+    TASK_CONCURRENCY,
+    TASK_CANCEL_EXCHANGE_NAME,
+    TASK_EVENTS_EXCHANGE_NAME,
+    TASK_RETRY_QUEUE_PREFIX,
+    TASK_DEAD_LETTER_QUEUE_NAME,
+    WORKER_DRAIN_TIMEOUT,
+    WORKER_HTTP_PORT,
+    WORKER_THREAD_POOL_SIZE,
+    WORKER_PROCESS_POOL_SIZE,
+    TASK_PREFETCH_MULTIPLIER,
+    TASK_CONCURRENCY_ADAPTIVE,
+    TASK_CONCURRENCY_MIN,
+    TASK_CONCURRENCY_MAX,
+    TASK_CONCURRENCY_INTERVAL,
+    TASK_LATENCY_TOLERANCE,
+    TASK_ERROR_RATE_THRESHOLD,
+    TASK_DB_WAIT_THRESHOLD,
+    PUBLISHER_CHANNELS,
+    PUBLISHER_BATCH_SIZE,
+    PUBLISHER_BATCH_DELAY_MS,
+    PUBLISHER_MAX_PENDING,
+    BROKER_PUBLISH_TIMEOUT,
+)
+from app.batching import Batcher
+from app.concurrency import ConcurrencyController
+from app.database.pg import close_pool, get_pool_stats, pool_wait_stats
+from app.dispatch import Dispatcher
+from app.metrics import CONTENT_TYPE, counter, gauge, histogram, render_metrics
+from app.progress import ProgressReporter, run_progress_flusher
+from app.publisher import Publisher
+from app.retry import RetryPolicy
+from app.tenants import DEFAULT_TENANT, tenant_weights
+from app.worker_http import add_route, start_http_server, stop_http_server
 
 logger = logging.getLogger(__name__)
 
 _connection: Optional[aio_pika.Connection] = None
 _channel: Optional[aio_pika.Channel] = None
+_cancel_exchange: Optional[aio_pika.Exchange] = None
+_events_exchange: Optional[aio_pika.Exchange] = None
+_publisher: Optional[Publisher] = None
+_publisher_lock = asyncio.Lock()
 _task_handlers: Dict[str, Callable] = {}
+_handler_options: Dict[str, Dict[str, Any]] = {}
+_executors: Dict[str, Executor] = {}
+_failure_handler: Optional[Callable] = None
+_retry_handler: Optional[Callable] = None
+_retry_queues: set = set()
+_dispatcher = Dispatcher(TASK_CONCURRENCY, tenant_weights)
+_controller: Optional[ConcurrencyController] = None
+_cancel_events: Dict[int, asyncio.Event] = {}
+_in_flight: Dict[int, Dict[str, Any]] = {}
+_batchers: Dict[str, Batcher] = {}
+_unacked: set = set()
+_consumers: List[Tuple[aio_pika.Queue, str]] = []
+_background_publishes: set = set()
+_shutdown: Optional[asyncio.Event] = None
+_draining = False
+
+queue_wait_seconds = histogram(
+    "task_queue_wait_seconds",
+    "Time from publishing a task until a worker slot started it",
+    ("task_type",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+handler_duration_seconds = histogram(
+    "task_handler_duration_seconds",
+    "Time spent running a task handler",
+    ("task_type",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 15, 30, 60, 120),
+)
+tasks_processed = counter(
+    "tasks_processed", "Task messages processed by outcome", ("task_type", "outcome")
+)
+task_retries = counter("task_retries", "Task retries scheduled", ("task_type",))
+task_dead_letters = counter(
+    "task_dead_letters", "Messages moved to the dead-letter queue", ("task_type",)
+)
+task_batch_size = histogram(
+    "task_batch_size",
+    "Messages passed to one batch handler call",
+    ("task_type",),
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+tasks_in_flight = gauge(
+    "tasks_in_flight", "Prefetched task messages by state", ("task_type", "state")
+)
 
 
 async def get_connection() -> aio_pika.Connection:
@@ -42,91 +131,887 @@ async def get_connection() -> aio_pika.Connection:
                 raise
 
 
+def get_task_queue_names() -> List[str]:
+    return [TASK_QUEUE_NAME] + [
+        f"{TASK_QUEUE_NAME}.{shard}" for shard in range(1, TASK_QUEUE_SHARDS)
+    ]
+
+
+def get_task_queue_name(tenant: Optional[str] = None) -> str:
+    # Tenants are hashed onto a fixed set of queues, so a tenant flooding the
+    # broker only fills its own shard while the others keep moving.
+    if TASK_QUEUE_SHARDS <= 1:
+        return TASK_QUEUE_NAME
+    shard = zlib.crc32((tenant or DEFAULT_TENANT).encode()) % TASK_QUEUE_SHARDS
+    return get_task_queue_names()[shard]
+
+
 async def get_channel() -> aio_pika.Channel:
-    global _channel
+    global _channel, _cancel_exchange, _events_exchange
 
     if _channel is None or _channel.is_closed:
         connection = await get_connection()
         _channel = await connection.channel()
 
-        await _channel.declare_queue(
-            TASK_QUEUE_NAME, durable=True, arguments={"x-max-priority": 10}
+        for queue_name in get_task_queue_names():
+            await _channel.declare_queue(
+                queue_name, durable=True, arguments={"x-max-priority": 10}
+            )
+        await _channel.declare_queue(TASK_DEAD_LETTER_QUEUE_NAME, durable=True)
+        _cancel_exchange = await _channel.declare_exchange(
+            TASK_CANCEL_EXCHANGE_NAME, aio_pika.ExchangeType.FANOUT
+        )
+        _events_exchange = await _channel.declare_exchange(
+            TASK_EVENTS_EXCHANGE_NAME, aio_pika.ExchangeType.TOPIC
         )
 
     return _channel
 
 
-async def publish_task(
-    task_type: str, payload: Dict[str, Any], priority: int = 0
-) -> None:
-    channel = await get_channel()
-    message_body = json.dumps({"task_type": task_type, "payload": payload}).encode()
-
-    message = aio_pika.Message(
+def build_task_message(
+    task_type: str,
+    payload: Dict[str, Any],
+    priority: int = 0,
+    attempt: int = 0,
+    delay: Optional[float] = None,
+    tenant: Optional[str] = None,
+) -> aio_pika.Message:
+    message_body = json.dumps(
+        {"task_type": task_type, "payload": payload}, separators=(",", ":")
+    ).encode()
+
+    headers = {"published_at": time.time() + (delay or 0)}
+    if attempt:
+        headers["attempt"] = attempt
+    if tenant:
+        headers["tenant"] = tenant
+
+    return aio_pika.Message(
         body=message_body,
         delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
         priority=priority,
+        headers=headers,
+        expiration=delay,
     )
 
-    await channel.default_exchange.publish(message, routing_key=TASK_QUEUE_NAME)
 
-    logger.info(f"Published task: {task_type} with payload: {payload}")
+async def get_publisher() -> Publisher:
+    global _publisher
+
+    async with _publisher_lock:
+        if _publisher is None or _publisher.connection.is_closed:
+            await get_channel()
+            _publisher = Publisher(
+                await get_connection(),
+                channels=PUBLISHER_CHANNELS,
+                batch_size=PUBLISHER_BATCH_SIZE,
+                batch_delay=PUBLISHER_BATCH_DELAY_MS / 1000,
+                max_pending=PUBLISHER_MAX_PENDING,
+            )
+            await _publisher.start()
+
+    return _publisher
+
+
+async def close_publisher() -> None:
+    global _publisher
+
+    if _publisher is not None:
+        await _publisher.close()
+        _publisher = None
+
+
+def get_publisher_stats() -> Optional[Dict[str, Any]]:
+    return _publisher.snapshot() if _publisher else None
+
+
+async def publish_task(
+    task_type: str,
+    payload: Dict[str, Any],
+    priority: int = 0,
+    tenant: Optional[str] = None,
+) -> None:
+    publisher = await get_publisher()
+    message = build_task_message(task_type, payload, priority, tenant=tenant)
+
+    await publisher.publish(message, routing_key=get_task_queue_name(tenant))
+
+    logger.debug(f"Published task: {task_type} with payload: {payload}")
+
+
+async def publish_tasks(
+    tasks: List[Tuple[str, Dict[str, Any], int, Optional[str]]]
+) -> None:
+    publisher = await get_publisher()
+
+    await asyncio.gather(
+        *(
+            publisher.publish(
+                build_task_message(task_type, payload, priority, tenant=tenant),
+                routing_key=get_task_queue_name(tenant),
+            )
+            for task_type, payload, priority, tenant in tasks
+        )
+    )
+
+    logger.info(f"Published {len(tasks)} tasks")
+
+
+async def publish_cancellation(task_id: int) -> None:
+    await get_channel()
+    message = aio_pika.Message(body=json.dumps({"task_id": task_id}).encode())
+
+    await _cancel_exchange.publish(message, routing_key="")
+
+    logger.info(f"Published cancellation for task {task_id}")
+
+
+async def publish_task_event(task_id: int, status: str, **fields: Any) -> None:
+    try:
+        await get_channel()
+        message = aio_pika.Message(
+            body=json.dumps(
+                {"task_id": task_id, "status": status, **fields},
+                separators=(",", ":"),
+                default=lambda value: value.isoformat(),
+            ).encode()
+        )
+        await _events_exchange.publish(message, routing_key=f"task.{status.lower()}")
+    except Exception as e:
+        logger.warning(f"Failed to publish event for task {task_id}: {str(e)}")
+
+
+def publish_in_background(publish: Awaitable, description: str) -> None:
+    # Signals from API requests are best-effort: the request returns at once
+    # and a broker that is down or reconnecting costs at most the timeout
+    # in the background instead of the connection retry loop in the request.
+    task = asyncio.ensure_future(asyncio.wait_for(publish, BROKER_PUBLISH_TIMEOUT))
+    _background_publishes.add(task)
+    task.add_done_callback(partial(_background_publish_done, description))
+
+
+def _background_publish_done(description: str, task: asyncio.Task) -> None:
+    _background_publishes.discard(task)
+    if task.cancelled():
+        return
+
+    error = task.exception()
+    if error is not None:
+        logger.warning(
+            f"Failed to publish {description}: {type(error).__name__}: {error}"
+        )
+
+
+def get_cancel_event(task_id: int) -> asyncio.Event:
+    event = _cancel_events.get(task_id)
+    if event is None:
+        event = _cancel_events[task_id] = asyncio.Event()
+    return event
 
 
-def register_task_handler(task_type: str):
+def release_cancel_event(task_id: int) -> None:
+    _cancel_events.pop(task_id, None)
+
+
+async def process_cancel_message(message: AbstractIncomingMessage) -> None:
+    try:
+        task_id = json.loads(message.body.decode())["task_id"]
+    except Exception as e:
+        logger.error(f"Invalid cancellation message: {e}")
+        return
+
+    event = _cancel_events.get(task_id)
+    if event is not None:
+        logger.info(f"Cancellation received for running task {task_id}")
+        event.set()
+
+
+def register_task_handler(
+    task_type: str,
+    executor: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+    weight: float = 1,
+    retry: Optional[RetryPolicy] = None,
+    progress: bool = False,
+    batch_size: Optional[int] = None,
+    max_wait_ms: float = 50,
+):
+    if executor not in (None, "thread", "process"):
+        raise ValueError(f"Unknown executor for {task_type}: {executor}")
+    if progress and executor == "process":
+        raise ValueError(
+            f"Progress reporting is not available for process handler {task_type}"
+        )
+    if progress and batch_size:
+        raise ValueError(
+            f"Progress reporting is not available for batch handler {task_type}"
+        )
+
     def decorator(func: Callable):
         _task_handlers[task_type] = func
+        _handler_options[task_type] = {
+            "executor": executor,
+            "concurrency": concurrency,
+            "timeout": timeout,
+            "weight": weight,
+            "retry": retry,
+            "progress": progress,
+            "batch_size": batch_size,
+        }
+        if batch_size:
+            _batchers[task_type] = Batcher(
+                batch_size, max_wait_ms / 1000, partial(start_batch, task_type)
+            )
+        _dispatcher.configure(task_type, concurrency=concurrency, weight=weight)
+        register_handler_metrics(task_type)
         logger.info(f"Registered task handler for type: {task_type}")
         return func
 
     return decorator
 
 
+def register_handler_metrics(task_type: str) -> None:
+    queue_wait_seconds.labels(task_type)
+    handler_duration_seconds.labels(task_type)
+    for outcome in ("success", "error", "timeout", "requeued"):
+        tasks_processed.labels(task_type, outcome)
+    task_retries.labels(task_type)
+    task_dead_letters.labels(task_type)
+
+    tasks_in_flight.labels(task_type, "running").set_function(
+        lambda: _dispatcher.running_count(task_type)
+    )
+    tasks_in_flight.labels(task_type, "waiting").set_function(
+        lambda: _dispatcher.waiting_count(task_type)
+    )
+
+
+def register_failure_handler(func: Callable):
+    global _failure_handler
+
+    _failure_handler = func
+    return func
+
+
+async def report_failure(
+    task_type: str, payload: Dict[str, Any], error_message: str
+) -> None:
+    if _failure_handler is None:
+        return
+
+    try:
+        await _failure_handler(task_type, payload, error_message)
+    except Exception as e:
+        logger.exception(f"Error reporting failure for {task_type}: {e}")
+
+
+def register_retry_handler(func: Callable):
+    global _retry_handler
+
+    _retry_handler = func
+    return func
+
+
+async def report_retry(
+    task_type: str,
+    payload: Dict[str, Any],
+    error_message: str,
+    attempt: int,
+    delay: float,
+) -> None:
+    if _retry_handler is None:
+        return
+
+    try:
+        await _retry_handler(task_type, payload, error_message, attempt, delay)
+    except Exception as e:
+        logger.exception(f"Error reporting retry for {task_type}: {e}")
+
+
+async def publish_retry(
+    task_type: str,
+    payload: Dict[str, Any],
+    priority: int,
+    attempt: int,
+    policy: RetryPolicy,
+    tenant: Optional[str] = None,
+) -> float:
+    # One delay queue per base backoff keeps message TTLs in a queue close
+    # together, so expiry at the head of the queue is not held up by a
+    # longer delay. Expired messages dead-letter back to the tenant's shard.
+    backoff = policy.get_backoff(attempt)
+    target = get_task_queue_name(tenant)
+    queue_name = f"{TASK_RETRY_QUEUE_PREFIX}.{int(backoff * 1000)}"
+    if target != TASK_QUEUE_NAME:
+        queue_name = f"{queue_name}.{target.rsplit('.', 1)[1]}"
+
+    if queue_name not in _retry_queues:
+        channel = await get_channel()
+        await channel.declare_queue(
+            queue_name,
+            durable=True,
+            arguments={
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": target,
+            },
+        )
+        _retry_queues.add(queue_name)
+
+    delay = policy.get_delay(attempt)
+    publisher = await get_publisher()
+    await publisher.publish(
+        build_task_message(
+            task_type, payload, priority, attempt=attempt, delay=delay, tenant=tenant
+        ),
+        routing_key=queue_name,
+    )
+    return delay
+
+
+async def dead_letter(
+    message: AbstractIncomingMessage, reason: str, attempt: int = 0
+) -> None:
+    publisher = await get_publisher()
+    await publisher.publish(
+        aio_pika.Message(
+            body=message.body,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            headers={
+                **(message.headers or {}),
+                "attempt": attempt,
+                "error": reason[:1000],
+                "dead_lettered_at": time.time(),
+            },
+        ),
+        routing_key=TASK_DEAD_LETTER_QUEUE_NAME,
+    )
+
+
+async def handle_failure(
+    message: AbstractIncomingMessage,
+    task_type: str,
+    payload: Dict[str, Any],
+    error_message: str,
+) -> bool:
+    attempt = int((message.headers or {}).get("attempt", 0)) + 1
+    policy = _handler_options[task_type]["retry"]
+
+    try:
+        if policy and policy.should_retry(attempt):
+            delay = await publish_retry(
+                task_type,
+                payload,
+                message.priority or 0,
+                attempt,
+                policy,
+                tenant=get_message_tenant(message),
+            )
+            logger.warning(
+                f"Retrying {task_type} with payload {payload} in {delay:.1f}s "
+                f"(attempt {attempt}/{policy.max_attempts})"
+            )
+            task_retries.labels(task_type).inc()
+            await report_retry(task_type, payload, error_message, attempt, delay)
+            return True
+
+        await dead_letter(message, error_message, attempt)
+        task_dead_letters.labels(task_type).inc()
+    except Exception as e:
+        logger.exception(f"Error handling failure of {task_type}: {e}")
+        return False
+
+    await report_failure(task_type, payload, error_message)
+    return True
+
+
+def get_executor(kind: str) -> Executor:
+    if kind not in _executors:
+        if kind == "process":
+            _executors[kind] = ProcessPoolExecutor(WORKER_PROCESS_POOL_SIZE)
+        else:
+            _executors[kind] = ThreadPoolExecutor(WORKER_THREAD_POOL_SIZE)
+    return _executors[kind]
+
+
+def shutdown_executors() -> None:
+    for executor in _executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
+
+
+async def run_handler(task_type: str, payload: Dict[str, Any]) -> Any:
+    handler = _task_handlers[task_type]
+    options = _handler_options[task_type]
+
+    if options["progress"]:
+        payload = {**payload, "progress": ProgressReporter(payload.get("task_id"))}
+
+    if options["executor"] is None:
+        return await handler(**payload)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(options["executor"]), partial(handler, **payload)
+    )
+
+
+async def run_batch_handler(task_type: str, payloads: List[Dict[str, Any]]) -> Any:
+    handler = _task_handlers[task_type]
+    executor = _handler_options[task_type]["executor"]
+
+    if executor is None:
+        return await handler(payloads)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_executor(executor), partial(handler, payloads)
+    )
+
+
+def get_in_flight_tasks() -> List[Dict[str, Any]]:
+    now = time.time()
+    return [
+        {
+            "delivery_tag": delivery_tag,
+            "task_type": entry["task_type"],
+            "tenant": entry["tenant"],
+            "payload": entry["payload"],
+            "redelivered": entry["redelivered"],
+            "state": "running" if entry["started_at"] else "waiting",
+            "started_at": entry["started_at"],
+            "elapsed_seconds": (
+                round(now - entry["started_at"], 3) if entry["started_at"] else None
+            ),
+        }
+        for delivery_tag, entry in _in_flight.items()
+    ]
+
+
+def get_worker_status() -> Dict[str, Any]:
+    return {
+        "draining": _draining,
+        "handlers": list(_task_handlers.keys()),
+        "in_flight_count": len(_in_flight),
+        "in_flight": get_in_flight_tasks(),
+        "dispatcher": _dispatcher.snapshot(),
+        "concurrency": (
+            _controller.snapshot()
+            if _controller
+            else {"limit": _dispatcher.limit, "adaptive": False}
+        ),
+        "database_pool": get_pool_stats(),
+        "batches": {
+            task_type: len(batcher) for task_type, batcher in _batchers.items()
+        },
+    }
+
+
+def _status_route() -> Tuple[int, str, bytes]:
+    return 200, "application/json", json.dumps(get_worker_status()).encode()
+
+
+def _metrics_route() -> Tuple[int, str, bytes]:
+    return 200, CONTENT_TYPE, render_metrics().encode()
+
+
+def _health_route() -> Tuple[int, str, bytes]:
+    if _draining:
+        return 503, "application/json", b'{"status": "draining"}'
+    return 200, "application/json", b'{"status": "ok"}'
+
+
+def get_message_tenant(message: AbstractIncomingMessage) -> str:
+    return (message.headers or {}).get("tenant") or DEFAULT_TENANT
+
+
 async def process_message(message: AbstractIncomingMessage) -> None:
-    async with message.process():
+    # Every delivery is tracked until it is acked or nacked, so a batch knows
+    # which of its tags a single ack with multiple=True may cover.
+    _unacked.add(message.delivery_tag)
+    batched = False
+    try:
+        batched = await handle_message(message)
+    finally:
+        if not batched:
+            _unacked.discard(message.delivery_tag)
+
+
+async def handle_message(message: AbstractIncomingMessage) -> bool:
+    if _draining:
+        await message.nack(requeue=True)
+        return False
+
+    try:
+        message_data = json.loads(message.body.decode())
+        task_type = message_data.get("task_type")
+        payload = message_data.get("payload", {})
+    except Exception as e:
+        logger.exception(f"Error decoding message: {e}")
+        try:
+            await dead_letter(message, f"Error decoding message: {e}")
+        except Exception as error:
+            logger.exception(f"Error dead-lettering message: {error}")
+            await message.reject(requeue=False)
+            return False
+        await message.ack()
+        return False
+
+    logger.info(f"Processing task: {task_type} with payload: {payload}")
+
+    if task_type not in _task_handlers:
+        logger.error(f"No handler registered for task type: {task_type}")
+        logger.error(f"Registered handlers: {list(_task_handlers.keys())}")
         try:
-            message_data = json.loads(message.body.decode())
-            task_type = message_data.get("task_type")
-            payload = message_data.get("payload", {})
+            await dead_letter(message, f"No handler registered for {task_type}")
+        except Exception as error:
+            logger.exception(f"Error dead-lettering message: {error}")
+            await message.nack(requeue=True)
+            return False
+        await report_failure(
+            task_type, payload, f"No handler registered for {task_type}"
+        )
+        await message.ack()
+        return False
+
+    batcher = _batchers.get(task_type)
+    if batcher is not None:
+        batcher.add((message, payload))
+        return True
+
+    tenant = get_message_tenant(message)
+    entry = _in_flight[message.delivery_tag] = {
+        "task_type": task_type,
+        "tenant": tenant,
+        "payload": payload,
+        "redelivered": message.redelivered,
+        "started_at": None,
+        "task": asyncio.current_task(),
+    }
+    timeout = _handler_options[task_type]["timeout"]
+    published_at = (message.headers or {}).get("published_at")
+    failed = True
+    try:
+        await _dispatcher.acquire(task_type, message.priority or 0, tenant)
+        try:
+            entry["started_at"] = time.time()
+            if isinstance(published_at, (int, float)):
+                queue_wait_seconds.labels(task_type).observe(
+                    max(entry["started_at"] - published_at, 0)
+                )
 
-            logger.info(f"Processing task: {task_type} with payload: {payload}")
+            await asyncio.wait_for(run_handler(task_type, payload), timeout)
+            failed = False
+        finally:
+            _dispatcher.release(task_type)
+            duration = time.time() - entry["started_at"]
+            handler_duration_seconds.labels(task_type).observe(duration)
+            if _controller and not _draining:
+                _controller.record(
+                    task_type, duration, error=failed, priority=message.priority or 0
+                )
+        tasks_processed.labels(task_type, "success").inc()
+    except asyncio.CancelledError:
+        logger.warning(
+            f"Task {task_type} with payload {payload} interrupted, requeueing"
+        )
+        tasks_processed.labels(task_type, "requeued").inc()
+        if not message.channel.is_closed:
+            await message.nack(requeue=True)
+        return False
+    except asyncio.TimeoutError:
+        error_message = f"Task {task_type} timed out after {timeout} seconds"
+        logger.error(f"{error_message}, payload: {payload}")
+        tasks_processed.labels(task_type, "timeout").inc()
+        handled = await handle_failure(message, task_type, payload, error_message)
+    except Exception as e:
+        logger.exception(f"Error processing message: {e}")
+        tasks_processed.labels(task_type, "error").inc()
+        handled = await handle_failure(
+            message, task_type, payload, f"{type(e).__name__}: {e}"
+        )
+    else:
+        handled = True
+    finally:
+        _in_flight.pop(message.delivery_tag, None)
 
-            if task_type in _task_handlers:
-                handler = _task_handlers[task_type]
-                await handler(**payload)
-            else:
-                logger.error(f"No handler registered for task type: {task_type}")
-                logger.error(f"Registered handlers: {list(_task_handlers.keys())}")
+    if not handled:
+        await message.nack(requeue=True)
+        return False
 
-        except Exception as e:
-            logger.exception(f"Error processing message: {e}")
+    await message.ack()
+    return False
 
 
-async def start_worker() -> None:
+def start_batch(
+    task_type: str, items: List[Tuple[AbstractIncomingMessage, Dict[str, Any]]]
+) -> None:
+    message = items[0][0]
+    entry = _in_flight[message.delivery_tag] = {
+        "task_type": task_type,
+        "tenant": get_message_tenant(message),
+        "payload": {"batch_size": len(items)},
+        "redelivered": any(message.redelivered for message, _ in items),
+        "started_at": None,
+    }
+    entry["task"] = asyncio.create_task(process_batch(task_type, items, entry))
+
+
+async def ack_batch(messages: List[AbstractIncomingMessage]) -> None:
+    tags = {message.delivery_tag for message in messages}
+    others = _unacked - tags
+    lowest = min(others) if others else None
+
+    covered = [
+        message
+        for message in messages
+        if lowest is None or message.delivery_tag < lowest
+    ]
+    if covered:
+        last = max(covered, key=lambda message: message.delivery_tag)
+        await last.ack(multiple=True)
+
+    for message in messages:
+        if lowest is not None and message.delivery_tag > lowest:
+            await message.ack()
+
+
+async def fail_batch_message(
+    message: AbstractIncomingMessage,
+    task_type: str,
+    payload: Dict[str, Any],
+    error_message: str,
+) -> None:
+    if await handle_failure(message, task_type, payload, error_message):
+        await message.ack()
+    else:
+        await message.nack(requeue=True)
+
+
+async def process_batch(
+    task_type: str,
+    items: List[Tuple[AbstractIncomingMessage, Dict[str, Any]]],
+    entry: Dict[str, Any],
+) -> None:
+    messages = [message for message, _ in items]
+    payloads = [payload for _, payload in items]
+    timeout = _handler_options[task_type]["timeout"]
+    failed = True
     try:
+        # A batch can mix tenants; it takes its turn as the tenant of its
+        # first message.
+        await _dispatcher.acquire(
+            task_type,
+            max(message.priority or 0 for message in messages),
+            entry["tenant"],
+        )
+        try:
+            entry["started_at"] = time.time()
+            for message in messages:
+                published_at = (message.headers or {}).get("published_at")
+                if isinstance(published_at, (int, float)):
+                    queue_wait_seconds.labels(task_type).observe(
+                        max(entry["started_at"] - published_at, 0)
+                    )
+            task_batch_size.labels(task_type).observe(len(items))
+
+            await asyncio.wait_for(run_batch_handler(task_type, payloads), timeout)
+            failed = False
+        finally:
+            _dispatcher.release(task_type)
+            duration = time.time() - entry["started_at"]
+            handler_duration_seconds.labels(task_type).observe(duration)
+            if _controller and not _draining:
+                _controller.record(
+                    task_type,
+                    duration,
+                    error=failed,
+                    priority=max(message.priority or 0 for message in messages),
+                )
+        tasks_processed.labels(task_type, "success").inc(len(items))
+    except asyncio.CancelledError:
+        logger.warning(
+            f"Batch of {len(items)} {task_type} tasks interrupted, requeueing"
+        )
+        tasks_processed.labels(task_type, "requeued").inc(len(items))
+        if not messages[0].channel.is_closed:
+            for message in messages:
+                await message.nack(requeue=True)
+    except Exception as e:
+        if isinstance(e, asyncio.TimeoutError):
+            error_message = f"Task {task_type} timed out after {timeout} seconds"
+            tasks_processed.labels(task_type, "timeout").inc(len(items))
+        else:
+            error_message = f"{type(e).__name__}: {e}"
+            tasks_processed.labels(task_type, "error").inc(len(items))
+        logger.exception(f"Batch of {len(items)} {task_type} tasks failed: {e}")
+
+        await asyncio.gather(
+            *(
+                fail_batch_message(message, task_type, payload, error_message)
+                for message, payload in items
+            ),
+            return_exceptions=True,
+        )
+    else:
+        try:
+            await ack_batch(messages)
+        except Exception as e:
+            logger.error(f"Error acking batch of {task_type} tasks: {str(e)}")
+    finally:
+        _in_flight.pop(messages[0].delivery_tag, None)
+        _unacked.difference_update(message.delivery_tag for message in messages)
+
+
+def request_shutdown() -> None:
+    if _shutdown is not None and not _shutdown.is_set():
+        logger.info("Shutdown requested, draining worker")
+        _shutdown.set()
+
+
+async def drain_worker() -> None:
+    global _draining
+
+    _draining = True
+    for queue, consumer_tag in _consumers:
+        await queue.cancel(consumer_tag)
+    _consumers.clear()
+
+    # Buffered batch messages go straight back to the queue. A batch started
+    # here would be cancelled below before it ran, leaving them unacked.
+    for batcher in _batchers.values():
+        for message, _ in batcher.clear():
+            _unacked.discard(message.delivery_tag)
+            await message.nack(requeue=True)
+
+    for entry in _in_flight.values():
+        if entry["started_at"] is None:
+            entry["task"].cancel()
+
+    tasks = [entry["task"] for entry in _in_flight.values() if entry["started_at"]]
+    logger.info(
+        f"Waiting up to {WORKER_DRAIN_TIMEOUT}s for {len(tasks)} in-flight tasks"
+    )
+
+    if tasks:
+        _, pending = await asyncio.wait(tasks, timeout=WORKER_DRAIN_TIMEOUT)
+
+        if pending:
+            logger.warning(
+                f"Drain deadline reached, requeueing {len(pending)} in-flight tasks"
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.wait(pending)
+
+    logger.info("Worker drained")
+
+
+async def start_consumers() -> None:
+    channel = await get_channel()
+    for queue_name in get_task_queue_names():
+        queue = await channel.get_queue(queue_name)
+        _consumers.append((queue, await queue.consume(process_message)))
+
+
+async def set_prefetch_limit(limit: int) -> None:
+    # A global count is one window shared by the consumers of every queue
+    # shard, and RabbitMQ applies a new value to them in place. A per-consumer
+    # count would only reach consumers started after the change.
+    # Messages buffered for a batch count against the same window, so a batch
+    # handler gets at most this many at once instead of widening the window
+    # for every other task type.
+    channel = await get_channel()
+    await channel.set_qos(prefetch_count=limit * TASK_PREFETCH_MULTIPLIER, global_=True)
+
+
+def start_concurrency_controller() -> Optional[asyncio.Task]:
+    global _controller
+
+    if not TASK_CONCURRENCY_ADAPTIVE:
+        return None
 
+    _controller = ConcurrencyController(
+        _dispatcher,
+        set_prefetch_limit,
+        min_limit=TASK_CONCURRENCY_MIN,
+        max_limit=TASK_CONCURRENCY_MAX,
+        latency_tolerance=TASK_LATENCY_TOLERANCE,
+        error_rate_threshold=TASK_ERROR_RATE_THRESHOLD,
+        wait_stats=pool_wait_stats,
+        db_wait_threshold=TASK_DB_WAIT_THRESHOLD,
+    )
+    logger.info(
+        f"Adaptive concurrency enabled within "
+        f"[{TASK_CONCURRENCY_MIN}, {TASK_CONCURRENCY_MAX}]"
+    )
+    return asyncio.create_task(_controller.run(TASK_CONCURRENCY_INTERVAL))
+
+
+async def start_worker(http_port: int = WORKER_HTTP_PORT) -> None:
+    global _shutdown
+
+    _shutdown = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, request_shutdown)
+
+    add_route("/status", _status_route)
+    add_route("/health", _health_route)
+    add_route("/metrics", _metrics_route)
+    gauge("worker_concurrency_limit", "Current number of worker slots").set_function(
+        lambda: _dispatcher.limit
+    )
+
+    controller_task = None
+    progress_task = None
+    try:
         logger.info(f"Registered task handlers: {list(_task_handlers.keys())}")
 
         channel = await get_channel()
-        queue = await channel.get_queue(TASK_QUEUE_NAME)
 
-        await channel.set_qos(prefetch_count=TASK_CONCURRENCY)
+        await set_prefetch_limit(_dispatcher.limit)
+
+        logger.info(f"Starting worker with concurrency: {_dispatcher.limit}")
+
+        await start_consumers()
 
-        logger.info(f"Starting worker with concurrency: {TASK_CONCURRENCY}")
+        cancel_queue = await channel.declare_queue(exclusive=True, auto_delete=True)
+        await cancel_queue.bind(_cancel_exchange)
+        await cancel_queue.consume(process_cancel_message, no_ack=True)
 
-        await queue.consume(process_message)
+        await start_http_server(http_port)
+        controller_task = start_concurrency_controller()
+        progress_task = asyncio.create_task(run_progress_flusher())
 
-        await asyncio.Future()
+        await _shutdown.wait()
+        if controller_task:
+            controller_task.cancel()
+        await drain_worker()
     except Exception as e:
         logger.exception(f"Error starting worker: {e}")
+        if _shutdown.is_set():
+            return
         await asyncio.sleep(5)
-        return await start_worker()
+        return await start_worker(http_port)
     finally:
+        if controller_task:
+            controller_task.cancel()
+        shutdown_executors()
+        await stop_http_server()
+        if progress_task:
+            progress_task.cancel()
+            await asyncio.gather(progress_task, return_exceptions=True)
+        await close_pool()
+        await close_publisher()
         if _connection and not _connection.is_closed:
             await _connection.close()
 
 
 async def shutdown_worker() -> None:
+    if _background_publishes:
+        await asyncio.gather(*_background_publishes, return_exceptions=True)
+    await close_publisher()
     if _connection and not _connection.is_closed:
         await _connection.close()
         logger.info("Worker connection closed")
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_routes: Dict[str, Callable[[], Tuple[int, str, bytes]]] = {}
+_server: Optional[asyncio.AbstractServer] = None
+
+_REASONS = {200: "OK", 404: "Not Found", 503: "Service Unavailable"}
+
+
+def add_route(path: str, handler: Callable[[], Tuple[int, str, bytes]]) -> None:
+    _routes[path] = handler
+
+
+async def _handle_request(
+    reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    try:
+        request_line = await reader.readline()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+
+        parts = request_line.decode("latin-1").split()
+        path = parts[1].split("?", 1)[0] if len(parts) > 1 else "/"
+        handler = _routes.get(path)
+
+        if handler is None:
+            status, content_type, body = 404, "text/plain", b"Not Found"
+        else:
+            status, content_type, body = handler()
+
+        writer.write(
+            (
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                "Connection: close\r\n\r\n"
+            ).encode()
+            + body
+        )
+        await writer.drain()
+    except Exception as e:
+        logger.error(f"Error handling worker HTTP request: {str(e)}")
+    finally:
+        writer.close()
+
+
+async def start_http_server(port: int) -> None:
+    global _server
+
+    if _server is not None or not port:
+        return
+
+    _server = await asyncio.start_server(_handle_request, "0.0.0.0", port)
+    logger.info(f"Worker HTTP server listening on port {port}")
+
+
+async def stop_http_server() -> None:
+    global _server
+
+    if _server is not None:
+        _server.close()
+        await _server.wait_closed()
+        _server = None
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from sqlalchemy import delete, insert
+
+import app.events as events
+from app.database.database import AsyncSessionLocal, engine
+from app.database.pg import close_pool, get_pool
+from app.models.task import Task, TaskStatus
+from app.repositories import task as repository
+from app.services.task import transition_task
+
+STEPS = [TaskStatus.PENDING, TaskStatus.IN_PROGRESS, TaskStatus.COMPLETED]
+
+
+async def create_tasks(count: int) -> List[int]:
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            insert(Task).returning(Task.id),
+            [{"title": f"Benchmark task {i}"} for i in range(count)],
+        )
+        task_ids = list(result.scalars().all())
+        await db.commit()
+    return task_ids
+
+
+async def delete_tasks(task_ids: List[int]) -> None:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Task).where(Task.id.in_(task_ids)))
+        await db.commit()
+
+
+async def run_orm(task_id: int, latencies: List[float]) -> None:
+    async with AsyncSessionLocal() as db:
+        for status in STEPS:
+            started = time.perf_counter()
+            await transition_task(db, task_id, status)
+            latencies.append(time.perf_counter() - started)
+
+
+async def run_asyncpg(task_id: int, latencies: List[float]) -> None:
+    for status in STEPS:
+        started = time.perf_counter()
+        await repository.transition_task(task_id, status)
+        latencies.append(time.perf_counter() - started)
+
+
+async def measure(
+    name: str,
+    runner: Callable[[int, List[float]], Awaitable[None]],
+    count: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    task_ids = await create_tasks(count)
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(task_id: int) -> None:
+        async with semaphore:
+            await runner(task_id, latencies)
+
+    cpu_started = time.process_time()
+    wall_started = time.perf_counter()
+    await asyncio.gather(*(run(task_id) for task_id in task_ids))
+    wall = time.perf_counter() - wall_started
+    cpu = time.process_time() - cpu_started
+
+    await delete_tasks(task_ids)
+
+    latencies.sort()
+    return {
+        "path": name,
+        "transitions": len(latencies),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "cpu_ms_per_task": cpu / count * 1000,
+        "tasks_per_second": count / wall,
+    }
+
+
+def skip_task_events(task_id: int, status: str) -> None:
+    pass
+
+
+async def main(count: int, concurrency: int, rounds: int) -> None:
+    # The API path invalidates the cache and publishes an event after every
+    # transition, while the repository leaves the event to set_task_status.
+    # Events are switched off so both paths do the same database work only.
+    events.notify_task_changed = skip_task_events
+    await get_pool()
+
+    # Warm up connection pools and statement caches on both paths.
+    await measure("orm", run_orm, concurrency, concurrency)
+    await measure("asyncpg", run_asyncpg, concurrency, concurrency)
+
+    results = []
+    for _ in range(rounds):
+        results.append(await measure("orm", run_orm, count, concurrency))
+        results.append(await measure("asyncpg", run_asyncpg, count, concurrency))
+
+    columns = list(results[0].keys())
+    print(" | ".join(f"{column:>16}" for column in columns))
+    for row in results:
+        print(
+            " | ".join(
+                f"{value:>16.3f}" if isinstance(value, float) else f"{value:>16}"
+                for value in row.values()
+            )
+        )
+
+    await close_pool()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare task transition latency between the ORM and asyncpg paths"
+    )
+    parser.add_argument("--tasks", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.tasks, args.concurrency, args.rounds))
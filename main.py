@@ -1,9 +1,12 @@
+import asyncio
 from fastapi import FastAPI
-from app.database import engine
-from app.models import Base
+from app.config import OUTBOX_RELAY_ENABLED, SCHEDULER_ENABLED
+from app.events import subscribe_task_events
 from app.routers import tasks_router
 from app.worker import get_connection, shutdown_worker
 from app.monitoring import setup_monitoring
+from app.outbox import run_outbox_relay
+from app.scheduler import run_scheduler
 
 app = FastAPI(
     title="Task Manager API",
@@ -13,17 +16,27 @@ app = FastAPI(
 
 app.include_router(tasks_router)
 
+background_tasks = []
+
 
 @app.on_event("startup")
 async def startup_db_client():
     await get_connection()
+    await subscribe_task_events()
+
+    if OUTBOX_RELAY_ENABLED:
+        background_tasks.append(asyncio.create_task(run_outbox_relay()))
 
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    if SCHEDULER_ENABLED:
+        background_tasks.append(asyncio.create_task(run_scheduler()))
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+
     await shutdown_worker()
 
 
@@ -0,0 +1,48 @@
+import sqlalchemy as sa
+from alembic import context, op
+
+# Databases created before the schema moved to Alembic were built by
+# create_all() at application startup and may already hold any table,
+# column or index a revision adds. These helpers skip existing objects so
+# `alembic upgrade head` brings such a database up to date as well. Offline
+# (--sql) runs cannot inspect the database and emit every statement.
+
+
+def _inspector():
+    if context.is_offline_mode():
+        return None
+    return sa.inspect(op.get_bind())
+
+
+def has_table(table: str) -> bool:
+    inspector = _inspector()
+    return inspector is not None and inspector.has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table(table):
+        return False
+    return column in {existing["name"] for existing in inspector.get_columns(table)}
+
+
+def has_index(table: str, index: str) -> bool:
+    inspector = _inspector()
+    if inspector is None or not inspector.has_table(table):
+        return False
+    return index in {existing["name"] for existing in inspector.get_indexes(table)}
+
+
+def create_table(table: str, *columns) -> None:
+    if not has_table(table):
+        op.create_table(table, *columns)
+
+
+def add_column(table: str, column: sa.Column) -> None:
+    if not has_column(table, column.name):
+        op.add_column(table, column)
+
+
+def create_index(index: str, table: str, columns) -> None:
+    if not has_index(table, index):
+        op.create_index(index, table, columns)
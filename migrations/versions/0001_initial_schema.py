@@ -0,0 +1,214 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.schema import create_index, create_table
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+TASK_STATUS = ("NEW", "PENDING", "IN_PROGRESS", "COMPLETED", "FAILED", "CANCELLED")
+TASK_PRIORITY = ("LOW", "MEDIUM", "HIGH")
+
+# Each statement adds its deltas to a random shard so concurrent transitions
+# don't queue on one row per (status, priority). time_min/time_max only widen;
+# rebuild_task_counters recomputes them exactly.
+TASK_COUNTERS_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION task_counters_add(
+        statuses taskstatus[],
+        priorities taskpriority[],
+        signs integer[],
+        durations double precision[]
+    ) RETURNS void AS $$
+        INSERT INTO task_counters AS c
+            (status, priority, shard, task_count, timed_count, time_sum, time_min, time_max)
+        SELECT
+            status,
+            priority,
+            floor(random() * 16)::int,
+            sum(sign),
+            coalesce(sum(sign) FILTER (WHERE duration IS NOT NULL), 0),
+            coalesce(sum(sign * duration), 0),
+            min(duration) FILTER (WHERE sign > 0),
+            max(duration) FILTER (WHERE sign > 0)
+        FROM unnest(statuses, priorities, signs, durations)
+            AS deltas(status, priority, sign, duration)
+        WHERE status IS NOT NULL AND priority IS NOT NULL
+        GROUP BY status, priority
+        ON CONFLICT (status, priority, shard) DO UPDATE SET
+            task_count = c.task_count + EXCLUDED.task_count,
+            timed_count = c.timed_count + EXCLUDED.timed_count,
+            time_sum = c.time_sum + EXCLUDED.time_sum,
+            time_min = LEAST(c.time_min, EXCLUDED.time_min),
+            time_max = GREATEST(c.time_max, EXCLUDED.time_max)
+    $$ LANGUAGE sql
+    """,
+    """
+    CREATE OR REPLACE FUNCTION task_counters_apply() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM task_counters_add(
+                array_agg(status),
+                array_agg(priority),
+                array_agg(1),
+                array_agg(EXTRACT(EPOCH FROM completed_at - started_at)::float8)
+            )
+            FROM new_rows;
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM task_counters_add(
+                array_agg(status),
+                array_agg(priority),
+                array_agg(-1),
+                array_agg(EXTRACT(EPOCH FROM completed_at - started_at)::float8)
+            )
+            FROM old_rows;
+        ELSE
+            PERFORM task_counters_add(
+                array_agg(status),
+                array_agg(priority),
+                array_agg(sign),
+                array_agg(EXTRACT(EPOCH FROM completed_at - started_at)::float8)
+            )
+            FROM (
+                SELECT n.status, n.priority, 1 AS sign, n.started_at, n.completed_at
+                FROM new_rows n JOIN old_rows o USING (id)
+                WHERE (n.status, n.priority, n.started_at, n.completed_at)
+                    IS DISTINCT FROM (o.status, o.priority, o.started_at, o.completed_at)
+                UNION ALL
+                SELECT o.status, o.priority, -1 AS sign, o.started_at, o.completed_at
+                FROM new_rows n JOIN old_rows o USING (id)
+                WHERE (n.status, n.priority, n.started_at, n.completed_at)
+                    IS DISTINCT FROM (o.status, o.priority, o.started_at, o.completed_at)
+            ) AS changed;
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE OR REPLACE TRIGGER task_counters_insert AFTER INSERT ON tasks
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER task_counters_update AFTER UPDATE ON tasks
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()
+    """,
+    """
+    CREATE OR REPLACE TRIGGER task_counters_delete AFTER DELETE ON tasks
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION task_counters_apply()
+    """,
+]
+
+SEED_TASK_COUNTERS_SQL = """
+INSERT INTO task_counters
+    (status, priority, shard, task_count, timed_count, time_sum, time_min, time_max)
+SELECT
+    status,
+    priority,
+    0,
+    count(*),
+    count(duration),
+    coalesce(sum(duration), 0),
+    min(duration),
+    max(duration)
+FROM (
+    SELECT
+        status,
+        priority,
+        EXTRACT(EPOCH FROM completed_at - started_at)::float8 AS duration
+    FROM tasks
+) AS t
+WHERE status IS NOT NULL AND priority IS NOT NULL
+    AND NOT EXISTS (SELECT 1 FROM task_counters)
+GROUP BY status, priority
+"""
+
+
+def upgrade() -> None:
+    create_table(
+        "tasks",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(length=255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("priority", sa.Enum(*TASK_PRIORITY, name="taskpriority")),
+        sa.Column("status", sa.Enum(*TASK_STATUS, name="taskstatus")),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+        ),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error_info", sa.Text(), nullable=True),
+    )
+    create_index("ix_tasks_id", "tasks", ["id"])
+
+    create_table(
+        "task_outbox",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("task_type", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+        ),
+    )
+
+    create_table(
+        "task_counters",
+        sa.Column(
+            "status",
+            postgresql.ENUM(*TASK_STATUS, name="taskstatus", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column(
+            "priority",
+            postgresql.ENUM(*TASK_PRIORITY, name="taskpriority", create_type=False),
+            primary_key=True,
+        ),
+        sa.Column("shard", sa.Integer(), primary_key=True),
+        sa.Column("task_count", sa.BigInteger(), nullable=False),
+        sa.Column("timed_count", sa.BigInteger(), nullable=False),
+        sa.Column("time_sum", sa.Float(), nullable=False),
+        sa.Column("time_min", sa.Float(), nullable=True),
+        sa.Column("time_max", sa.Float(), nullable=True),
+    )
+
+    for statement in TASK_COUNTERS_DDL:
+        op.execute(statement)
+
+    op.execute(SEED_TASK_COUNTERS_SQL)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS task_counters_delete ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS task_counters_update ON tasks")
+    op.execute("DROP TRIGGER IF EXISTS task_counters_insert ON tasks")
+    op.execute("DROP FUNCTION IF EXISTS task_counters_apply()")
+    op.execute(
+        "DROP FUNCTION IF EXISTS "
+        "task_counters_add(taskstatus[], taskpriority[], integer[], double precision[])"
+    )
+    op.drop_table("task_counters")
+    op.drop_table("task_outbox")
+    op.drop_index("ix_tasks_id", table_name="tasks")
+    op.drop_table("tasks")
+    sa.Enum(name="taskstatus").drop(op.get_bind())
+    sa.Enum(name="taskpriority").drop(op.get_bind())
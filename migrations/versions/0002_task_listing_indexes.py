@@ -0,0 +1,35 @@
+"""composite indexes for keyset task listing
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:10:00.000000
+
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = {
+    "ix_tasks_created_at_id": "created_at, id",
+    "ix_tasks_status_created_at_id": "status, created_at, id",
+    "ix_tasks_priority_created_at_id": "priority, created_at, id",
+    "ix_tasks_status_priority_created_at_id": "status, priority, created_at, id",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES.items():
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON tasks ({columns})"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,44 @@
+"""scheduled task execution
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:20:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema import add_column, create_index, create_table
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column(
+        "tasks", sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=True)
+    )
+
+    create_table(
+        "task_schedule",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("task_type", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column("scheduled_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+        ),
+    )
+    create_index("ix_task_schedule_scheduled_at", "task_schedule", ["scheduled_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_task_schedule_scheduled_at", table_name="task_schedule")
+    op.drop_table("task_schedule")
+    op.drop_column("tasks", "scheduled_at")
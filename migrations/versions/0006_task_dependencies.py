@@ -0,0 +1,62 @@
+"""task dependencies
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 01:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema import add_column, create_index, create_table
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column(
+        "tasks",
+        sa.Column("pending_parents", sa.Integer(), nullable=False, server_default="0"),
+    )
+    create_table(
+        "task_dependencies",
+        sa.Column(
+            "depends_on_id",
+            sa.Integer(),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column(
+            "task_id",
+            sa.Integer(),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+    )
+    create_index("ix_task_dependencies_task_id", "task_dependencies", ["task_id"])
+    create_table(
+        "task_waiting",
+        sa.Column(
+            "task_id",
+            sa.Integer(),
+            sa.ForeignKey("tasks.id", ondelete="CASCADE"),
+            primary_key=True,
+        ),
+        sa.Column("task_type", sa.String(length=64), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=False),
+        sa.Column(
+            "created_at", sa.DateTime(timezone=True), server_default=sa.func.now()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("task_waiting")
+    op.drop_index("ix_task_dependencies_task_id", table_name="task_dependencies")
+    op.drop_table("task_dependencies")
+    op.drop_column("tasks", "pending_parents")
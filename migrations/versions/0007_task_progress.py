@@ -0,0 +1,29 @@
+"""task progress
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 02:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema import add_column
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column("tasks", sa.Column("progress", sa.Float(), nullable=True))
+    add_column(
+        "tasks", sa.Column("progress_message", sa.String(length=255), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tasks", "progress_message")
+    op.drop_column("tasks", "progress")
@@ -0,0 +1,45 @@
+"""task tenants
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 04:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.schema import add_column
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+MESSAGE_TABLES = ("task_outbox", "task_schedule", "task_waiting")
+
+
+def upgrade() -> None:
+    add_column(
+        "tasks",
+        sa.Column(
+            "tenant", sa.String(length=64), nullable=False, server_default="default"
+        ),
+    )
+    for table in MESSAGE_TABLES:
+        add_column(table, sa.Column("tenant", sa.String(length=64), nullable=True))
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_tasks_tenant_created_at_id "
+            "ON tasks (tenant, created_at, id)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_tasks_tenant_created_at_id")
+
+    for table in MESSAGE_TABLES:
+        op.drop_column(table, "tenant")
+    op.drop_column("tasks", "tenant")
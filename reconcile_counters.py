@@ -0,0 +1,22 @@
+import asyncio
+import logging
+from app.database.database import AsyncSessionLocal
+from app.services.counters import rebuild_task_counters
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    async with AsyncSessionLocal() as db:
+        await rebuild_task_counters(db)
+
+
+if __name__ == "__main__":
+    logger.info("Rebuilding task counters...")
+    asyncio.run(main())
+    logger.info("Task counters rebuilt")
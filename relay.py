@@ -0,0 +1,24 @@
+import asyncio
+import logging
+from app.config import SCHEDULER_ENABLED
+from app.outbox import run_outbox_relay
+from app.scheduler import run_scheduler
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def main():
+    if SCHEDULER_ENABLED:
+        await asyncio.gather(run_outbox_relay(), run_scheduler())
+    else:
+        await run_outbox_relay()
+
+
+if __name__ == "__main__":
+    logger.info("Starting outbox relay...")
+    asyncio.run(main())
@@ -1,5 +1,8 @@
+import argparse
 import asyncio
 import logging
+from app.config import WORKER_PROCESSES
+from app.supervisor import run_supervisor
 from app.worker import start_worker
 import app.tasks
 
@@ -11,5 +14,17 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 if __name__ == "__main__":
-    logger.info("Starting task worker...")
-    asyncio.run(start_worker())
+    parser = argparse.ArgumentParser(description="Task worker")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=WORKER_PROCESSES,
+        help="Number of consumer processes to run under a supervisor",
+    )
+    args = parser.parse_args()
+
+    if args.processes > 1:
+        run_supervisor(args.processes)
+    else:
+        logger.info("Starting task worker...")
+        asyncio.run(start_worker())